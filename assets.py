@@ -0,0 +1,67 @@
+import os
+
+try:
+    from PIL import Image as PILImage
+except ImportError:  # Pillow is optional; without it the original images are used as-is
+    PILImage = None
+
+
+# 🖼️ Asset cache: backgrounds pre-scaled to the window size, small UI images packed into one atlas
+CACHE_DIR = "cache"
+BACKGROUND_DIR = os.path.join(CACHE_DIR, "backgrounds")
+UI_ATLAS = os.path.join(CACHE_DIR, "ui")
+UI_ATLAS_SIZE = 512
+
+
+def is_fresh(target, sources):
+    if not os.path.exists(target):
+        return False
+    built = os.path.getmtime(target)
+    return all(os.path.getmtime(source) <= built for source in sources if os.path.exists(source))
+
+
+def scaled_path(source, size):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(BACKGROUND_DIR, f"{stem}_{int(size[0])}x{int(size[1])}.png")
+
+
+def cached_background(source, size):
+    # Cheap enough for the UI thread: only stats files, never decodes
+    target = scaled_path(source, size)
+    return target if is_fresh(target, [source]) else source
+
+
+def prescale_background(source, size):
+    # Writes a copy of source resized to exactly size (backgrounds are stretched to fill the
+    # window anyway), so the texture uploaded is no bigger than the screen it is drawn on
+    width, height = int(size[0]), int(size[1])
+    target = scaled_path(source, (width, height))
+    if PILImage is None or not os.path.exists(source) or width <= 0 or height <= 0:
+        return source
+    if is_fresh(target, [source]):
+        return target
+
+    with PILImage.open(source) as image:
+        if image.width <= width and image.height <= height:
+            return source  # upscaling on disk would only make the upload bigger
+        os.makedirs(BACKGROUND_DIR, exist_ok=True)
+        resized = image.resize((width, height), PILImage.LANCZOS)
+        temp = target + ".tmp"
+        resized.save(temp, "PNG")
+    os.replace(temp, target)
+    return target
+
+
+def build_ui_atlas(sources):
+    # Packs the small images into one texture page; returns {image name: atlas:// source}
+    sources = [source for source in sources if os.path.exists(source)]
+    if PILImage is None or not sources:
+        return {}
+    if not is_fresh(UI_ATLAS + ".atlas", sources):
+        from kivy.atlas import Atlas
+
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        if not Atlas.create(UI_ATLAS, sources, UI_ATLAS_SIZE):
+            return {}
+    atlas_url = "atlas://" + UI_ATLAS.replace(os.sep, "/")
+    return {source: f"{atlas_url}/{os.path.splitext(os.path.basename(source))[0]}" for source in sources}
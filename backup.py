@@ -0,0 +1,282 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+# 💾 Online backups of tenants.db. SQLite's backup API copies the live database a few pages at a
+# time into a scratch file (the app keeps reading and writing meanwhile); the copy is then cut into
+# chunks stored gzipped under their SHA-256, so a snapshot only adds the chunks that changed since
+# the last one. A snapshot itself is a small JSON manifest listing its chunks in order:
+#   backups/chunks/3f/3fa9….gz
+#   backups/snapshots/20240601-031500.json
+CHUNK_SIZE = 64 * 1024  # a whole number of pages for every SQLite page size
+BACKUP_PAGES = 256  # pages copied per backup step
+STEP_PAUSE = 0.005  # seconds between steps, so a big copy never hogs the disk
+COMPRESS_LEVEL = 6  # 9 is five times slower for 1% smaller chunks
+RETRY_DELAY = 600  # seconds before trying again after a failed scheduled backup
+backup_lock = threading.Lock()  # one snapshot or rotation at a time in this process
+
+
+def chunk_path(backup_dir, digest):
+    return os.path.join(backup_dir, "chunks", digest[:2], digest + ".gz")
+
+
+def snapshot_path(backup_dir, name):
+    return os.path.join(backup_dir, "snapshots", name + ".json")
+
+
+def remove_database_file(path):
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def copy_database(db_path, target, pages=BACKUP_PAGES, pause=STEP_PAUSE):
+    # A consistent copy of a database that may be in use. The open read transaction pins the copy
+    # to one WAL snapshot: without it, every commit from the app would restart the copy from page 1.
+    # Writers are not blocked; only checkpoints wait until the copy is done.
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"no database at {db_path}")
+    source = sqlite3.connect(db_path, isolation_level=None)
+    dest = sqlite3.connect(target)
+    try:
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()  # starts the read
+        source.backup(dest, pages=pages, progress=lambda status, remaining, total: time.sleep(pause))
+        source.execute("COMMIT")
+        dest.execute("PRAGMA journal_mode = DELETE")  # one self-contained file to chunk up
+    finally:
+        dest.close()
+        source.close()
+
+
+def store_chunks(path, backup_dir):
+    # Returns (chunk digests, chunks newly stored, digest of the whole file)
+    digests, new = [], 0
+    whole = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            whole.update(chunk)
+            digest = hashlib.sha256(chunk).hexdigest()
+            digests.append(digest)
+            stored = chunk_path(backup_dir, digest)
+            if os.path.exists(stored):
+                continue
+            os.makedirs(os.path.dirname(stored), exist_ok=True)
+            with gzip.open(stored + ".tmp", "wb", compresslevel=COMPRESS_LEVEL) as out:
+                out.write(chunk)
+            os.replace(stored + ".tmp", stored)
+            new += 1
+    return digests, new, whole.hexdigest()
+
+
+def take_snapshot(db_path="tenants.db", backup_dir="backups"):
+    # Copies db_path into the store and returns the new snapshot's manifest
+    with backup_lock:
+        started = time.perf_counter()
+        os.makedirs(os.path.join(backup_dir, "snapshots"), exist_ok=True)
+        scratch = os.path.join(backup_dir, "partial.db")
+        remove_database_file(scratch)  # left over from a backup cut short
+        try:
+            copy_database(db_path, scratch)
+            digests, new, whole = store_chunks(scratch, backup_dir)
+            size = os.path.getsize(scratch)
+        finally:
+            remove_database_file(scratch)
+
+        created = datetime.now()
+        name = created.strftime("%Y%m%d-%H%M%S")
+        suffix = 1
+        while os.path.exists(snapshot_path(backup_dir, name)):
+            suffix += 1
+            name = f"{created:%Y%m%d-%H%M%S}-{suffix}"
+        manifest = {
+            "name": name,
+            "created": created.isoformat(timespec="seconds"),
+            "source": os.path.abspath(db_path),
+            "size": size,
+            "sha256": whole,
+            "chunk_size": CHUNK_SIZE,
+            "chunks": digests,
+            "new_chunks": new,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        path = snapshot_path(backup_dir, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+        return manifest
+
+
+def list_snapshots(backup_dir="backups"):
+    # Manifests, oldest first
+    folder = os.path.join(backup_dir, "snapshots")
+    if not os.path.isdir(folder):
+        return []
+    manifests = []
+    for filename in sorted(os.listdir(folder)):
+        if filename.endswith(".json"):
+            with open(os.path.join(folder, filename), encoding="utf-8") as f:
+                manifests.append(json.load(f))
+    manifests.sort(key=lambda manifest: (manifest["created"], manifest["name"]))  # "-2" after its first
+    return manifests
+
+
+def find_snapshot(backup_dir, name="latest"):
+    snapshots = list_snapshots(backup_dir)
+    if not snapshots:
+        raise ValueError(f"no snapshots in {backup_dir}")
+    if name == "latest":
+        return snapshots[-1]
+    for manifest in snapshots:
+        if manifest["name"] == name:
+            return manifest
+    raise ValueError(f"no snapshot named {name!r} in {backup_dir}")
+
+
+def write_snapshot(backup_dir, manifest, target):
+    # Reassembles a snapshot into target, checking every chunk and the whole file against the manifest
+    whole = hashlib.sha256()
+    with open(target, "wb") as out:
+        for index, digest in enumerate(manifest["chunks"]):
+            try:
+                with gzip.open(chunk_path(backup_dir, digest), "rb") as f:
+                    chunk = f.read()
+            except (OSError, EOFError) as e:
+                raise ValueError(f"chunk {index} of snapshot {manifest['name']} is unreadable: {e}") from None
+            if hashlib.sha256(chunk).hexdigest() != digest:
+                raise ValueError(f"chunk {index} of snapshot {manifest['name']} is corrupt")
+            whole.update(chunk)
+            out.write(chunk)
+    if whole.hexdigest() != manifest["sha256"] or os.path.getsize(target) != manifest["size"]:
+        raise ValueError(f"snapshot {manifest['name']} does not add up to the database it recorded")
+
+
+def check_database(path):
+    # SQLite's own consistency check; returns the number of tenants in the file
+    conn = sqlite3.connect(path)
+    try:
+        problems = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        if problems != ["ok"]:
+            raise ValueError(f"integrity check failed: {'; '.join(problems[:5])}")
+        return conn.execute("SELECT COUNT(*) FROM tenants").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def verify_snapshot(backup_dir="backups", name="latest"):
+    # Restores a snapshot to a scratch file and checks it; returns (manifest, tenant count)
+    manifest = find_snapshot(backup_dir, name)
+    scratch = os.path.join(backup_dir, "verify.db")
+    try:
+        write_snapshot(backup_dir, manifest, scratch)
+        return manifest, check_database(scratch)
+    finally:
+        remove_database_file(scratch)
+
+
+def restore_snapshot(backup_dir="backups", name="latest", target="tenants.db"):
+    # Only with the app and server stopped. The current file is kept as <target>.before-restore
+    manifest = find_snapshot(backup_dir, name)
+    scratch = target + ".restoring"
+    remove_database_file(scratch)
+    try:
+        write_snapshot(backup_dir, manifest, scratch)
+        tenants = check_database(scratch)
+    except Exception:
+        remove_database_file(scratch)
+        raise
+    if os.path.exists(target):
+        kept = target + ".before-restore"
+        remove_database_file(kept)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(target + suffix):
+                os.replace(target + suffix, kept + suffix)  # a stale WAL must not be replayed into the restored file
+    os.replace(scratch, target)
+    return manifest, tenants
+
+
+def rotate(backup_dir="backups", keep=7, days=30):
+    # Retention: the newest `keep` snapshots, plus the last one of each day for `days` days.
+    # Chunks no remaining snapshot uses are deleted. Returns the number of snapshots removed.
+    with backup_lock:
+        snapshots = list_snapshots(backup_dir)
+        kept = {manifest["name"] for manifest in snapshots[-keep:]} if keep > 0 else set()
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        last_of_day = {}
+        for manifest in snapshots:
+            if manifest["created"] >= cutoff:
+                last_of_day[manifest["created"][:10]] = manifest["name"]
+        kept.update(last_of_day.values())
+
+        removed = 0
+        used = set()
+        for manifest in snapshots:
+            if manifest["name"] in kept:
+                used.update(manifest["chunks"])
+            else:
+                os.remove(snapshot_path(backup_dir, manifest["name"]))
+                removed += 1
+
+        chunks = os.path.join(backup_dir, "chunks")
+        for folder, _, filenames in os.walk(chunks):
+            for filename in filenames:
+                if filename.endswith(".gz") and filename[:-3] not in used:
+                    os.remove(os.path.join(folder, filename))
+        return removed
+
+
+class BackupSchedule:
+    # Takes a snapshot (and rotates) every `hours` on its own thread, counting from the newest
+    # snapshot on disk, so restarting the app does not reset the clock
+    def __init__(self, db_path, backup_dir, hours, keep=7, days=30, startup_delay=60):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.interval = hours * 3600
+        self.keep = keep
+        self.days = days
+        self.startup_delay = startup_delay  # not while the app is still starting up
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="backup", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def seconds_until_due(self):
+        try:
+            snapshots = list_snapshots(self.backup_dir)
+        except (OSError, ValueError):
+            snapshots = []
+        if not snapshots:
+            return self.startup_delay
+        last = datetime.fromisoformat(snapshots[-1]["created"])
+        due = (last - datetime.now()).total_seconds() + self.interval
+        return max(self.startup_delay, due)
+
+    def run(self):
+        delay = self.seconds_until_due()
+        while not self.stopped.wait(delay):
+            try:
+                manifest = take_snapshot(self.db_path, self.backup_dir)
+                removed = rotate(self.backup_dir, self.keep, self.days)
+            except (sqlite3.Error, OSError, ValueError) as e:
+                print(f"Error backing up {self.db_path}: {e}")
+                delay = RETRY_DELAY
+                continue
+            print(
+                f"Backed up {self.db_path} as {manifest['name']} in {manifest['ms']:.0f} ms "
+                f"({manifest['new_chunks']} of {len(manifest['chunks'])} chunks new, {removed} old snapshot(s) removed)"
+            )
+            delay = self.interval
@@ -0,0 +1,269 @@
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+
+import settings
+from floorplans import load_layouts
+from repository import TenantRepository, parse_date, today_str
+
+
+# 🖥️ Headless command line for reports and scripts. Never imports Kivy, so it starts in a few
+# tens of milliseconds and runs from cron on a box with no display:
+#   python bedspace.py occupancy [--date 2024-03-01]
+#   python bedspace.py vacant
+#   python bedspace.py leaving --days 7
+#   python bedspace.py payments --month 2024-06 [--list]
+#   python bedspace.py timeline --start 2024-01-01 --end 2024-02-01
+#   python bedspace.py import tenants.csv [--errors rejected.csv]
+#   python bedspace.py export tenants.jsonl
+#   python bedspace.py backup | backups | verify [NAME] | restore [NAME]
+# Add --json for machine-readable output, --server URL to ask a running server.py instead of the file.
+def open_repository(args):
+    if args.server:
+        from remote import RemoteRepository  # urllib is only imported when it is needed
+
+        return RemoteRepository(args.server, token=settings.SERVER_TOKEN)
+    return TenantRepository(args.db)
+
+
+def emit(args, data, lines):
+    if args.json:
+        print(json.dumps(data, indent=2))
+    else:
+        for line in lines:
+            print(line)
+
+
+def occupied_bunks(repo, as_of):
+    rows = repo.active_bunks_at(as_of) if as_of else repo.active_bunks()
+    return {row[1] for row in rows}
+
+
+def room_occupancy(args, repo):
+    occupied = occupied_bunks(repo, args.date)
+    rooms = []
+    for plan in load_layouts(args.layouts):
+        bunks = [bunk for bunk, _, _ in plan["bunks"]]
+        taken = [bunk for bunk in bunks if bunk in occupied]
+        rooms.append({
+            "name": plan["name"], "title": plan["title"], "room": plan["room"],
+            "bunks": len(bunks), "occupied": len(taken),
+            "vacant": [bunk for bunk in bunks if bunk not in occupied],
+        })
+    return rooms
+
+
+def cmd_occupancy(args, repo):
+    rooms = room_occupancy(args, repo)
+    total = sum(room["bunks"] for room in rooms)
+    taken = sum(room["occupied"] for room in rooms)
+    as_of = args.date or today_str()
+    lines = [f"Occupancy on {as_of}"]
+    for room in rooms:
+        lines.append(f"  {room['title']:<20} {room['occupied']:>3}/{room['bunks']:<3} {percent(room['occupied'], room['bunks'])}")
+    lines.append(f"  {'Total':<20} {taken:>3}/{total:<3} {percent(taken, total)}")
+    emit(args, {"date": as_of, "occupied": taken, "bunks": total, "rooms": rooms}, lines)
+
+
+def cmd_vacant(args, repo):
+    rooms = room_occupancy(args, repo)
+    lines = [f"{room['title']}: {', '.join(room['vacant']) or '(none)'}" for room in rooms]
+    emit(args, {room["name"]: room["vacant"] for room in rooms}, lines)
+
+
+def cmd_leaving(args, repo):
+    start = date.fromisoformat(today_str())
+    end = start + timedelta(days=args.days)
+    tenants = repo.tenants_leaving(start.isoformat(), end.isoformat())
+    lines = [f"{len(tenants)} tenant(s) leaving {start} to {end}"]
+    lines += [f"  {t[7]}  {t[2]:<8} {t[3]} ({t[5] or 'no contact'})  paid ₱{t[6]:,.2f}" for t in tenants]
+    emit(args, [tenant_json(t) for t in tenants], lines)
+
+
+def cmd_payments(args, repo):
+    start, end = payment_range(args)
+    count, total = repo.payment_totals(start, end)
+    lines = [f"Payments {start} to {end} (exclusive): {count} totalling ₱{total:,.2f}"]
+    data = {"start": start, "end": end, "count": count, "total": total}
+    if args.list:
+        payments = repo.payments_between(start, end)
+        lines += [f"  {p[5]}  {p[3] or '?':<8} {p[2] or f'tenant {p[1]}'}  ₱{p[4]:,.2f}" for p in payments]
+        data["payments"] = [
+            {"id": p[0], "tenant_id": p[1], "name": p[2], "bunk": p[3], "amount": p[4], "paid_at": p[5]}
+            for p in payments
+        ]
+    emit(args, data, lines)
+
+
+def cmd_timeline(args, repo):
+    from timeline import occupancy_series
+
+    series = occupancy_series(repo.stays_between(args.start, args.end), args.start, args.end)
+    lines = [f"{day}  {bunks:>4} bunks  {tenants:>4} tenants" for day, bunks, tenants in series]
+    emit(args, [{"date": day, "bunks": bunks, "tenants": tenants} for day, bunks, tenants in series], lines)
+
+
+def cmd_import(args, repo):
+    from transfer import import_tenants, write_error_report
+
+    imported, rejected = import_tenants(repo, args.file)
+    lines = [f"Imported {imported} tenant(s) from {args.file}, rejected {len(rejected)}"]
+    lines += [f"  line {line}: {reason}" for line, reason in rejected[:20]]
+    if len(rejected) > 20:
+        lines.append(f"  ... and {len(rejected) - 20} more")
+    if args.errors and rejected:
+        write_error_report(rejected, args.errors)
+        lines.append(f"Rejected rows written to {args.errors}")
+    emit(args, {"imported": imported, "rejected": [{"line": line, "error": e} for line, e in rejected]}, lines)
+    return 1 if rejected else 0
+
+
+def cmd_export(args, repo):
+    from transfer import export_tenants
+
+    count = export_tenants(repo, args.file)
+    emit(args, {"exported": count, "file": args.file}, [f"Exported {count} tenant(s) to {args.file}"])
+
+
+def cmd_backup(args, repo):
+    import backup
+
+    manifest = backup.take_snapshot(args.db, args.dir)
+    removed = backup.rotate(args.dir, settings.BACKUP_KEEP, settings.BACKUP_DAYS)
+    lines = [
+        f"Snapshot {manifest['name']}: {manifest['size'] / 1048576:.1f} MB in {manifest['ms']:.0f} ms, "
+        f"{manifest['new_chunks']} of {len(manifest['chunks'])} chunks new",
+    ]
+    if removed:
+        lines.append(f"Removed {removed} old snapshot(s)")
+    emit(args, snapshot_json(manifest, removed=removed), lines)
+
+
+def cmd_backups(args, repo):
+    import backup
+
+    snapshots = backup.list_snapshots(args.dir)
+    lines = [f"{m['name']}  {m['created']}  {m['size'] / 1048576:>7.1f} MB  {m['new_chunks']:>5} new chunks" for m in snapshots]
+    emit(args, [snapshot_json(m) for m in snapshots], lines or [f"No snapshots in {args.dir}"])
+
+
+def cmd_verify(args, repo):
+    import backup
+
+    manifest, tenants = backup.verify_snapshot(args.dir, args.name)
+    emit(args, snapshot_json(manifest, tenants=tenants), [f"Snapshot {manifest['name']} is intact: {tenants} tenant(s)"])
+
+
+def cmd_restore(args, repo):
+    import backup
+
+    manifest, tenants = backup.restore_snapshot(args.dir, args.name, args.db)
+    emit(args, snapshot_json(manifest, tenants=tenants), [
+        f"Restored {args.db} from snapshot {manifest['name']} ({tenants} tenant(s))",
+        f"The previous file is kept as {args.db}.before-restore",
+    ])
+
+
+def snapshot_json(manifest, **extra):
+    keys = ("name", "created", "size", "sha256", "new_chunks", "ms")
+    return dict({key: manifest[key] for key in keys}, chunks=len(manifest["chunks"]), **extra)
+
+
+def percent(part, whole):
+    return f"{part / whole:.0%}" if whole else "-"
+
+
+def tenant_json(t):
+    keys = ("id", "room", "bunk", "name", "date", "number", "balance", "leave_date")
+    return dict(zip(keys, t))
+
+
+def payment_range(args):
+    # [start, end) as paid_at prefixes: a month, or explicit --from/--to dates
+    if args.month:
+        first = date.fromisoformat(args.month + "-01")
+        following = (first + timedelta(days=32)).replace(day=1)
+        return first.isoformat(), following.isoformat()
+    start = parse_date(args.start) or "0000-01-01"
+    end = parse_date(args.end)
+    end = (date.fromisoformat(end) + timedelta(days=1)).isoformat() if end else "9999-12-31"
+    return start, end
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bedspace", description="Bed Space reports without the GUI")
+    parser.add_argument("--db", default="tenants.db", help="tenants database (default: tenants.db)")
+    parser.add_argument("--server", help="URL of a running server.py to query instead of --db")
+    parser.add_argument("--layouts", default="layouts.json")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of text")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    occupancy = commands.add_parser("occupancy", help="occupied bunks per room")
+    occupancy.add_argument("--date", type=parse_date, help="as of this date instead of today")
+    occupancy.set_defaults(run=cmd_occupancy)
+
+    vacant = commands.add_parser("vacant", help="vacant bunks per room")
+    vacant.add_argument("--date", type=parse_date, help="as of this date instead of today")
+    vacant.set_defaults(run=cmd_vacant)
+
+    leaving = commands.add_parser("leaving", help="tenants due to leave soon")
+    leaving.add_argument("--days", type=int, default=7)
+    leaving.set_defaults(run=cmd_leaving)
+
+    payments = commands.add_parser("payments", help="payments received in a period")
+    payments.add_argument("--month", help="YYYY-MM")
+    payments.add_argument("--from", dest="start", help="first day (default: the beginning)")
+    payments.add_argument("--to", dest="end", help="last day, included (default: today and later)")
+    payments.add_argument("--list", action="store_true", help="list every payment, not just the total")
+    payments.set_defaults(run=cmd_payments)
+
+    timeline = commands.add_parser("timeline", help="occupied bunks per day")
+    timeline.add_argument("--start", required=True, type=parse_date)
+    timeline.add_argument("--end", required=True, type=parse_date, help="first day not included")
+    timeline.set_defaults(run=cmd_timeline)
+
+    bulk_import = commands.add_parser("import", help="add tenants from a .csv, .json or .jsonl file")
+    bulk_import.add_argument("file")
+    bulk_import.add_argument("--errors", help="write rejected rows to this CSV")
+    bulk_import.set_defaults(run=cmd_import, local_only=True)
+
+    export = commands.add_parser("export", help="write every tenant to a .csv, .json or .jsonl file")
+    export.add_argument("file")
+    export.set_defaults(run=cmd_export, local_only=True)
+
+    snapshot = commands.add_parser("backup", help="take a snapshot of the database now, then rotate old ones")
+    snapshot.set_defaults(run=cmd_backup, local_only=True, no_repository=True)
+    snapshots = commands.add_parser("backups", help="list snapshots")
+    snapshots.set_defaults(run=cmd_backups, local_only=True, no_repository=True)
+    verify = commands.add_parser("verify", help="check that a snapshot restores to an intact database")
+    verify.add_argument("name", nargs="?", default="latest")
+    verify.set_defaults(run=cmd_verify, local_only=True, no_repository=True)
+    restore = commands.add_parser("restore", help="replace --db with a verified snapshot (stop the app first)")
+    restore.add_argument("name", nargs="?", default="latest")
+    restore.set_defaults(run=cmd_restore, local_only=True, no_repository=True)
+    for command in (snapshot, snapshots, verify, restore):
+        command.add_argument("--dir", default=settings.BACKUP_DIR, help=f"snapshot store (default: {settings.BACKUP_DIR})")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.server and getattr(args, "local_only", False):
+        parser.error(f"{args.command} works on the database file; run it on the server with --db")
+    try:
+        # The backup commands work on the file itself: for restore it may be missing or damaged
+        repo = None if getattr(args, "no_repository", False) else open_repository(args)
+        try:
+            return args.run(args, repo) or 0
+        finally:
+            if repo is not None:
+                repo.close()
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
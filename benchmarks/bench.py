@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from floorplans import load_layouts  # noqa: E402
+from repository import TenantRepository  # noqa: E402
+from synthetic import LAYOUTS, generate  # noqa: E402
+from timeline import daily_occupancy, room_dashboard  # noqa: E402
+from transfer import export_tenants, import_tenants  # noqa: E402
+
+
+# ⏱️ Times the app's hot data paths against a temporary synthetic tenants.db. Headless: no Kivy.
+#   python benchmarks/bench.py --rows 1000,10000,100000 --active-ratio 0.1,0.5
+# Results go to benchmarks/results/<timestamp>.json so runs can be compared over time.
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+SEARCHES = ["ana", "santos", "8U1", "0917", "dela cruz"]
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(times), 3), "min_ms": round(min(times), 3), "runs": repeat}
+
+
+def bench_reads(repo, repeat):
+    plan = load_layouts(LAYOUTS)[1]
+    bunks = [bunk for bunk, _, _ in plan["bunks"]]
+    today = date.today()
+    year_ago = (today - timedelta(days=365)).isoformat()
+    return {
+        # OccupancyModel.load
+        "occupancy_load": timed(repo.active_bunks, repeat),
+        "occupancy_snapshot_room": timed(lambda: repo.occupancy_snapshot(bunks), repeat),
+        # TenantRepository.active_tenants_in_bunk backs the bunk popup
+        "bunk_popup": timed(lambda: repo.active_tenants_in_bunk(bunks[0]), repeat),
+        # TenantInfoScreen.refresh
+        "tenant_info_refresh": timed(repo.active_tenants, repeat),
+        # ... which now fetches one keyset page at a time
+        "tenant_info_first_page": timed(lambda: repo.active_tenants_page("name", None, 50), repeat),
+        "tenant_info_page_by_room": timed(lambda: repo.active_tenants_page("room", ["1508", 0], 50), repeat),
+        # search_tenant_popup / the Tenant Info search box
+        "search": timed(lambda: [repo.search_active_tenants(text) for text in SEARCHES], repeat),
+        "occupancy_as_of": timed(lambda: repo.active_bunks_at(year_ago), repeat),
+        "occupancy_series_year": timed(lambda: daily_occupancy(repo, year_ago, today.isoformat()), repeat),
+        "payment_totals_month": timed(lambda: repo.payment_totals(f"{today:%Y-%m}-01", "9999"), repeat),
+        # DashboardScreen, from the rollup tables
+        "dashboard_12_months": timed(lambda: room_dashboard(repo, 12), repeat),
+    }
+
+
+def bench_writes(repo, repeat):
+    bunk = load_layouts(LAYOUTS)[1]["bunks"][0][0]
+    ids = []
+
+    def add_and_commit():
+        ids.append(repo.add_tenant("1508", bunk, "Bench Tenant", "09170000000", date.today().isoformat(), "500"))
+        repo.flush()
+
+    # The burst pays 50 different tenants, seeded up front so it never depends on `repeat`
+    burst_ids = [repo.add_tenant("1508", bunk, f"Burst Tenant {n}", "09170000000", date.today().isoformat(), "")
+                 for n in range(50)]
+    repo.flush()
+
+    def burst_of_edits():
+        # What the worker does with a burst of taps: many writes, one commit
+        for tenant_id in burst_ids:
+            repo.record_payment(tenant_id, 100)
+        repo.flush()
+
+    results = {
+        "add_tenant_commit": timed(add_and_commit, repeat),
+        "record_payment_commit": timed(lambda: (repo.record_payment(ids[0], 100), repo.flush()), repeat),
+        "leave_date_commit": timed(lambda: (repo.update_leave_date(ids[0], "2099-01-01"), repo.flush()), repeat),
+        "burst_50_payments": timed(burst_of_edits, repeat),
+    }
+    results["delete_tenant_commit"] = timed(lambda: (repo.delete_tenant(ids.pop()), repo.flush()), repeat)
+    return results
+
+
+def bench_transfer(repo, workdir):
+    export_path = os.path.join(workdir, "export.csv")
+    started = time.perf_counter()
+    exported = export_tenants(repo, export_path)
+    export_ms = (time.perf_counter() - started) * 1000
+
+    fresh = TenantRepository(os.path.join(workdir, "import.db"))
+    started = time.perf_counter()
+    imported, rejected = import_tenants(fresh, export_path)
+    import_ms = (time.perf_counter() - started) * 1000
+    fresh.close()
+    return {
+        "export_csv": {"median_ms": round(export_ms, 3), "rows": exported},
+        "import_csv": {"median_ms": round(import_ms, 3), "rows": imported, "rejected": len(rejected)},
+    }
+
+
+def run_case(rows, active_ratio, seed, repeat, workdir, transfer):
+    path = generate(os.path.join(workdir, "tenants.db"), rows, active_ratio, seed)
+    started = time.perf_counter()
+    repo = TenantRepository(path)  # runs every migration on the legacy-schema file
+    results = {"migrate": {"median_ms": round((time.perf_counter() - started) * 1000, 3), "runs": 1}}
+    try:
+        results.update(bench_reads(repo, repeat))
+        results.update(bench_writes(repo, repeat))
+        if transfer:
+            results.update(bench_transfer(repo, workdir))
+        active = len(repo.active_bunks())
+    finally:
+        repo.close()
+    return {"rows": rows, "active_ratio": active_ratio, "active_tenants": active, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the tenant data paths on synthetic data")
+    parser.add_argument("--rows", default="1000,10000,100000", help="comma-separated sizes, up to 1000000")
+    parser.add_argument("--active-ratio", default="0.1,0.5", help="comma-separated share of active tenants")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-transfer", action="store_true", help="skip the import/export timings")
+    parser.add_argument("--transfer-max-rows", type=int, default=20000,
+                        help="only time import/export up to this many rows (default: 20000; 0 for no limit)")
+    parser.add_argument("--output", help=f"results file (default: {RESULTS_DIR}/<timestamp>.json)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "cases": [],
+    }
+    workdir = tempfile.mkdtemp(prefix="bedspace-bench-")
+    try:
+        for rows in (int(n) for n in args.rows.split(",")):
+            for active_ratio in (float(r) for r in args.active_ratio.split(",")):
+                # A 1M-row import alone takes minutes, so the big sizes skip it unless asked
+                transfer = not args.no_transfer and (not args.transfer_max_rows or rows <= args.transfer_max_rows)
+                case = run_case(rows, active_ratio, args.seed, args.repeat, workdir, transfer)
+                report["cases"].append(case)
+                print(f"{rows} rows, {active_ratio:.0%} active:")
+                for name, result in case["results"].items():
+                    print(f"  {name:<26} {result['median_ms']:>10.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
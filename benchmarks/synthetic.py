@@ -0,0 +1,103 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from floorplans import load_layouts  # noqa: E402
+
+
+# 🧪 Deterministic synthetic tenants.db in the original (pre-migration) schema, with the
+# messy leave dates and payment cells the real data has, so migrations run on it too.
+# Dates are laid out relative to today, so the active/historical split holds whenever it runs;
+# the same (rows, active_ratio, seed) gives the same tenants on any given day.
+LEGACY_SCHEMA = """
+    CREATE TABLE tenants (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        room TEXT,
+        bunk TEXT,
+        name TEXT,
+        date TEXT,
+        number TEXT,
+        payment TEXT DEFAULT '',
+        leave_date TEXT DEFAULT ''
+    )
+"""
+FIRST_NAMES = ["Ana", "Ben", "Carlo", "Dina", "Ella", "Fe", "Gino", "Hana", "Ivan", "Joy",
+               "Kim", "Lea", "Marco", "Nina", "Oscar", "Pia", "Quin", "Rosa", "Sam", "Tess"]
+LAST_NAMES = ["Reyes", "Santos", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores",
+              "Ramos", "Aquino", "Castro", "Rivera", "Navarro", "Dela Cruz", "Villanueva"]
+DATE_STYLES = ["%Y-%m-%d", "%Y-%m-%d", "%Y-%m-%d", "%m/%d/%Y", "%d %b %Y", "%B %d, %Y"]
+LAYOUTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "layouts.json")
+
+
+def messy_date(rng, day):
+    return day.strftime(rng.choice(DATE_STYLES))
+
+
+def open_leave_date(rng):
+    # How the sheet says "still here"
+    return rng.choice(["", "", "", "N/A", "n/a", None, "soon", "TBD"])
+
+
+def payment_cell(rng):
+    roll = rng.random()
+    if roll < 0.15:
+        return ""
+    if roll < 0.2:
+        return rng.choice(["paid", "-", "?"])
+    amount = rng.randrange(500, 5000, 50)
+    return rng.choice([f"{amount}", f"{amount}.0", f"{amount:,}", f"₱{amount}"])
+
+
+def tenant_rows(rows, active_ratio, seed, today=None):
+    rng = random.Random(seed)
+    today = today or date.today()
+    rooms = {bunk: layout["room"] for layout in load_layouts(LAYOUTS) for bunk, _, _ in layout["bunks"]}
+    # Enough extra bunks that the active tenants spread out like a bigger building would
+    bunks = list(rooms) + [f"X{n:05d}" for n in range(max(0, int(rows * active_ratio) - len(rooms)))]
+    for n in range(rows):
+        bunk = rng.choice(bunks)
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}"
+        number = f"09{rng.randrange(10 ** 9):09d}"
+        if rng.random() < active_ratio:
+            move_in = today - timedelta(days=rng.randrange(1, 400))
+            leave = rng.random() < 0.3 and messy_date(rng, today + timedelta(days=rng.randrange(1, 200)))
+            leave = leave or open_leave_date(rng)
+        else:
+            move_in = today - timedelta(days=rng.randrange(400, 3650))
+            leave = messy_date(rng, move_in + timedelta(days=rng.randrange(1, 365)))
+        start = messy_date(rng, move_in) if rng.random() > 0.03 else ""
+        yield (rooms.get(bunk, "1600"), bunk, name, start, number, payment_cell(rng), leave)
+
+
+def generate(path, rows, active_ratio=0.1, seed=1):
+    if os.path.exists(path):
+        os.remove(path)
+    db = sqlite3.connect(path)
+    db.execute(LEGACY_SCHEMA)
+    db.executemany(
+        "INSERT INTO tenants (room, bunk, name, date, number, payment, leave_date) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        tenant_rows(rows, active_ratio, seed),
+    )
+    db.commit()
+    db.close()
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic tenants.db in the original schema")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--active-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    generate(args.path, args.rows, args.active_ratio, args.seed)
+    print(f"Wrote {args.rows} tenants to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+# 🧵 Database worker: one thread owns its own repository (a TenantRepository connection, or a
+# RemoteRepository talking to server.py) and runs every query and write in the order they were
+# submitted, so a slow scan, fsync or network call never blocks the caller.
+# Local writes join one open transaction, committed commit_delay seconds after the first of them
+# however busy the queue is (a stream of reads never holds the write lock open), so a burst of
+# edits costs a single commit. Callers hear about a write
+# before that commit: if the commit then fails, the burst is rolled back and on_commit_failed(error)
+# is called (on the worker thread) so the caller can reload what it shows.
+COMMIT_DELAY = 0.5
+
+
+class DatabaseWorker:
+    def __init__(self, open_repository, commit_delay=COMMIT_DELAY, on_commit_failed=None):
+        # open_repository is called on the worker thread, since a sqlite3 connection belongs to its thread
+        self.open_repository = open_repository
+        self.commit_delay = commit_delay
+        self.on_commit_failed = on_commit_failed
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="db-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, method, *args, **kwargs):
+        # method is a repository method name, or a callable that is passed the repository
+        future = Future()
+        self.jobs.put((future, method, args, kwargs))
+        return future
+
+    def run(self):
+        try:
+            repo = self.open_repository()
+        except Exception as e:
+            self.fail_all(e)
+            return
+
+        pending_since = None  # when the oldest uncommitted write was made
+        while True:
+            wait = None
+            if repo.has_pending_writes():
+                if pending_since is None:
+                    pending_since = time.monotonic()
+                wait = pending_since + self.commit_delay - time.monotonic()
+                if wait <= 0:
+                    self.commit(repo)
+                    pending_since = None
+                    continue
+            else:
+                pending_since = None
+            try:
+                job = self.jobs.get(timeout=wait)
+            except queue.Empty:
+                continue  # the commit is due: made at the top of the loop
+            if job is None:
+                break
+
+            future, method, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if callable(method):
+                    result = method(repo, *args, **kwargs)
+                else:
+                    result = getattr(repo, method)(*args, **kwargs)
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+        self.commit(repo)
+        repo.close()
+
+    def commit(self, repo):
+        try:
+            repo.flush()
+        except Exception as e:
+            print(f"Error committing changes: {e}")
+            if self.on_commit_failed is not None:
+                self.on_commit_failed(e)
+
+    def fail_all(self, error):
+        # The database could not be opened: every job, now and later, fails with that error
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            future = job[0]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(error)
+
+    def close(self):
+        # Runs everything already queued, commits, and closes the connection
+        if self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join()
@@ -0,0 +1,58 @@
+import json
+
+
+# 🗺️ Floor-plan layouts: one entry per room screen, loaded from layouts.json
+DEFAULT_BUTTON_SIZE = (0.15, 0.1)
+
+
+def load_layouts(path="layouts.json"):
+    with open(path, encoding="utf-8") as f:
+        layouts = json.load(f)
+
+    names = set()
+    for layout in layouts:
+        for key in ("name", "title", "room", "background", "bunks"):
+            if key not in layout:
+                raise ValueError(f"layout {layout.get('name', '?')!r} is missing {key!r}")
+        if layout["name"] in names:
+            raise ValueError(f"duplicate layout name {layout['name']!r}")
+        names.add(layout["name"])
+
+        # A repeated bunk would silently share (and overwrite) one button, so refuse it up front
+        seen = set()
+        for bunk, x, y in layout["bunks"]:
+            if bunk in seen:
+                raise ValueError(f"bunk {bunk!r} appears twice in layout {layout['name']!r}")
+            seen.add(bunk)
+        layout["button_size"] = tuple(layout.get("button_size", DEFAULT_BUTTON_SIZE))
+    return layouts
+
+
+class BunkGrid:
+    # Spatial hash for tapping a marker: the plan (0..1 on both axes) is cut into a grid and each
+    # cell lists the markers overlapping it, so a tap only checks the few bunks in its own cell
+    def __init__(self, bunks, marker_size):
+        self.width, self.height = marker_size
+        self.columns = max(1, min(int(1 / self.width), int(len(bunks) ** 0.5) or 1))
+        self.rows = max(1, min(int(1 / self.height), int(len(bunks) ** 0.5) or 1))
+        self.cells = {}
+        for bunk, x, y in bunks:
+            for column in range(self.column(x), self.column(x + self.width) + 1):
+                for row in range(self.row(y), self.row(y + self.height) + 1):
+                    self.cells.setdefault((column, row), []).append((bunk, x, y))
+
+    def column(self, x):
+        return min(self.columns - 1, max(0, int(x * self.columns)))
+
+    def row(self, y):
+        return min(self.rows - 1, max(0, int(y * self.rows)))
+
+    def hit(self, x, y):
+        # The bunk whose marker contains (x, y), the one drawn last if markers overlap
+        if not (0 <= x <= 1 and 0 <= y <= 1):
+            return None
+        found = None
+        for bunk, left, bottom in self.cells.get((self.column(x), self.row(y)), ()):
+            if left <= x <= left + self.width and bottom <= y <= bottom + self.height:
+                found = bunk
+        return found
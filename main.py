@@ -1,47 +1,370 @@
+import heapq
+import math
+import threading
+import time
+
+STARTUP_T0 = time.perf_counter()  # before Kivy is imported, so the cold-start report includes it
+
 from kivy.app import App
 from kivy.uix.screenmanager import ScreenManager, Screen
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
+from kivy.uix.togglebutton import ToggleButton
+from kivy.uix.spinner import Spinner
+from kivy.uix.scatter import Scatter
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics.transformation import Matrix
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.popup import Popup
-import sqlite3
-from datetime import datetime
-from kivy.uix.image import Image
+from kivy.clock import Clock
+from kivy.uix.image import Image, AsyncImage
+from kivy.loader import Loader
+from kivy.cache import Cache
 from kivy.uix.floatlayout import FloatLayout
+from kivy.uix.gridlayout import GridLayout
 from kivy.graphics import Rectangle
 from kivy.uix.video import Video
 from kivy.graphics import Color
 from kivy.graphics import Line
+from kivy.event import EventDispatcher
 from functools import partial
+from datetime import date, datetime
+from repository import TenantRepository, is_active, page_key, parse_amount, parse_date, today_str
+from dbworker import DatabaseWorker
+from backup import BackupSchedule
+from remote import ChangeFollower, RemoteRepository
+from floorplans import BunkGrid, load_layouts
+from timeline import room_dashboard
+from assets import CACHE_DIR, build_ui_atlas, cached_background, prescale_background
+import settings
+import profiling
+import os
+import uuid
+
+
+# 🗺️ Floor plans from layouts.json, read when the app builds (not at import) and shared by the
+# menu, the floor-plan screens, the dashboard's bunk counts and the image preload
+FLOOR_PLANS = []
+BACKGROUND_IMAGES = []
+ROOM_BUNKS = {}  # room -> number of bunks drawn for it
+
+
+def load_floor_plans(path="layouts.json"):
+    FLOOR_PLANS[:] = load_layouts(path)
+    BACKGROUND_IMAGES[:] = [plan['background'] for plan in FLOOR_PLANS]
+    ROOM_BUNKS.clear()
+    for plan in FLOOR_PLANS:
+        ROOM_BUNKS[plan['room']] = ROOM_BUNKS.get(plan['room'], 0) + len(plan['bunks'])
+
+
+# 🖼️ Images: room backgrounds come pre-scaled to the window from the disk cache once the
+# preload has made them; small UI images are served from one atlas page
+UI_IMAGES = ['tenantinfo.png']
+ui_atlas = {}  # filled in by the preload thread
+
+
+def image_source(source):
+    from kivy.core.window import Window
+    return ui_atlas.get(source) or cached_background(source, Window.size)
+
+
+def release_image(image):
+    # Frees the texture of a screen that is no longer visible; it is reloaded on the next visit
+    if image.source:
+        Cache.remove('kv.loader', image.source)
+        image.source = ''
+
+
+# ✅ SQLite Setup: every query and write runs on the database worker thread, never on the UI thread,
+# against tenants.db or, when BEDSPACE_SERVER is set, the shared tenant service
+if settings.PROFILE:
+    profiling.enable(settings.SLOW_QUERY_MS)
+CLIENT_ID = uuid.uuid4().hex
+
+
+def open_repository():
+    if settings.SERVER_URL:
+        return RemoteRepository(settings.SERVER_URL, CLIENT_ID, settings.SERVER_TOKEN)
+    if settings.PROFILE:
+        return TenantRepository("tenants.db", factory=profiling.TimedConnection)
+    return TenantRepository("tenants.db")
+
+
+db = None  # started by the first run_db call, so importing this module opens no database
+
+
+def show_error(title, message):
+    Popup(title=title, content=Label(text=message), size_hint=(0.8, 0.3)).open()
+
+
+def check_date(text, title):
+    # A date typed into a form; blank means none. A bad one is explained in a popup, so the
+    # caller can keep the form open instead of losing what was typed.
+    try:
+        parse_date(text)
+    except ValueError:
+        show_error(title, f"{text.strip()!r} is not a date.\nUse YYYY-MM-DD, e.g. {today_str()}.")
+        return False
+    return True
+
+
+def read_amount(text):
+    # A payment typed into either screen: "1500", "₱1,500.50", or negative for a refund/correction.
+    # Anything else is refused with a popup rather than silently ignored.
+    amount = parse_amount(text)
+    if amount is None or amount == 0 or not math.isfinite(amount):
+        show_error("Invalid Payment", f"{text.strip()!r} is not an amount.\nUse a number like 1500, or -200 for a refund.")
+        return None
+    return amount
+
+
+def commit_failed(error):
+    # Edits are reported as done before the worker commits them; when that commit fails they are
+    # rolled back, so say so and reload occupancy (the Tenant Info and dashboard screens follow it)
+    def reload(dt):
+        show_error("Changes Not Saved", "Recent changes could not be saved and were undone.")
+        occupancy.load()
+    Clock.schedule_once(reload)
+
+
+def run_db(method, *args, on_done=None, error="Database error", **kwargs):
+    # Submits a repository call; on_done(result) runs on the UI thread through the Clock.
+    # A ValueError (input the repository refused) is shown in a popup titled <error>;
+    # other failures are printed as "<error>: <exception>"
+    submitted = time.perf_counter()
+
+    def deliver(future):
+        Clock.schedule_once(lambda dt: finish(future))
+
+    def finish(future):
+        if profiling.profiler is not None:
+            # Submit to callback: queueing behind other jobs + the query + the wait for the next frame
+            name = method if isinstance(method, str) else method.__name__
+            profiling.profiler.record('db', name, (time.perf_counter() - submitted) * 1000)
+        try:
+            result = future.result()
+        except ValueError as e:
+            show_error(error, str(e))
+            return
+        except Exception as e:
+            print(f"{error}: {e}")
+            return
+        if on_done is not None:
+            on_done(result)
+
+    global db
+    if db is None:
+        db = DatabaseWorker(open_repository, on_commit_failed=commit_failed)
+    future = db.submit(method, *args, **kwargs)
+    future.add_done_callback(deliver)
+    return future
+
+
+OCCUPIED_COLOR = (1, 0, 0, 0.5)  # Red
+VACANT_COLOR = (0, 1, 0, 0.5)  # Green
+LOADING_COLOR = (0.5, 0.5, 0.5, 0.5)  # Grey, until the occupancy model has loaded
+
+
+def bunk_color(occupied):
+    if occupied is None:
+        return LOADING_COLOR
+    return OCCUPIED_COLOR if occupied else VACANT_COLOR
+
+
+# 🧠 Shared occupancy model: every screen reads bunk status from here and
+# every write path reports its change here, so no screen has to re-query.
+# Upcoming leave dates sit in a heap; one Clock event wakes up when the earliest one arrives
+# and moves out just the tenants whose stay ended, so a kiosk left running stays correct.
+EXPIRY_RECHECK = 3600  # seconds; long waits are split so a clock change or sleep can't skip a day
+
+
+class OccupancyModel(EventDispatcher):
+    __events__ = ('on_bunk_changed', 'on_tenant_changed', 'on_loaded')
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.active_by_bunk = {}  # bunk -> set of active tenant ids
+        self.bunk_by_tenant = {}  # active tenant id -> bunk
+        self.leave_by_tenant = {}  # active tenant id -> leave date, for those who have one
+        self.expiries = []  # heap of (leave date, tenant id); stale entries are skipped when popped
+        self.expiry_event = None
+        self.loaded = False  # loaded on first use, or by the app's preload once the menu is up
+        self.loading = False
+
+    def load(self):
+        self.loading = True
+        run_db('active_bunks', on_done=self.apply_load, error="Error loading occupancy")
+
+    def apply_load(self, rows):
+        # Worker results arrive in submission order, so edits made while loading are already in rows
+        self.active_by_bunk = {}
+        self.bunk_by_tenant = {}
+        self.leave_by_tenant = {}
+        for tenant_id, bunk, leave_date in rows:
+            self.active_by_bunk.setdefault(bunk, set()).add(tenant_id)
+            self.bunk_by_tenant[tenant_id] = bunk
+            if leave_date is not None:
+                self.leave_by_tenant[tenant_id] = leave_date
+        self.expiries = [(leave_date, tenant_id) for tenant_id, leave_date in self.leave_by_tenant.items()]
+        heapq.heapify(self.expiries)
+        self.schedule_expiry()
+        self.loaded = True
+        self.loading = False
+        self.dispatch('on_loaded')
+
+    def ensure_loaded(self):
+        if not self.loaded and not self.loading:
+            self.load()
+
+    def is_occupied(self, bunk_name):
+        # None while the first load is still running
+        self.ensure_loaded()
+        if not self.loaded:
+            return None
+        return bool(self.active_by_bunk.get(bunk_name))
+
+    def tenant_added(self, tenant_id, bunk_name, leave_date=None):
+        self.ensure_loaded()
+        if is_active(leave_date, today_str()):
+            self._set_active(tenant_id, bunk_name, leave_date)
+        self.dispatch('on_tenant_changed', tenant_id)
+
+    def leave_date_changed(self, tenant_id, leave_date, bunk_name=None):
+        self.ensure_loaded()
+        bunk_name = self.bunk_by_tenant.get(tenant_id, bunk_name)
+        if bunk_name is None:
+            # Only a tenant who had already left can be missing; look up where they stayed
+            run_db('tenant_bunk', tenant_id,
+                   on_done=lambda bunk_name: bunk_name and self._apply_leave_date(tenant_id, bunk_name, leave_date))
+            return
+        self._apply_leave_date(tenant_id, bunk_name, leave_date)
+
+    def _apply_leave_date(self, tenant_id, bunk_name, leave_date):
+        if is_active(leave_date, today_str()):
+            self._set_active(tenant_id, bunk_name, leave_date)
+        else:
+            self._set_inactive(tenant_id)
+        self.dispatch('on_tenant_changed', tenant_id)
+
+    def payment_changed(self, tenant_id):
+        self.dispatch('on_tenant_changed', tenant_id)
+
+    def tenant_removed(self, tenant_id):
+        self.ensure_loaded()
+        self._set_inactive(tenant_id)
+        self.dispatch('on_tenant_changed', tenant_id)
+
+    def _set_inactive(self, tenant_id):
+        self.leave_by_tenant.pop(tenant_id, None)
+        bunk_name = self.bunk_by_tenant.pop(tenant_id, None)
+        if bunk_name is None:
+            return
+        tenants = self.active_by_bunk[bunk_name]
+        tenants.discard(tenant_id)
+        if not tenants:
+            del self.active_by_bunk[bunk_name]
+            self.dispatch('on_bunk_changed', bunk_name, False)
 
+    def _set_active(self, tenant_id, bunk_name, leave_date=None):
+        self._track_leave(tenant_id, leave_date)
+        if tenant_id in self.bunk_by_tenant:
+            return
+        was_occupied = bool(self.active_by_bunk.get(bunk_name))
+        self.active_by_bunk.setdefault(bunk_name, set()).add(tenant_id)
+        self.bunk_by_tenant[tenant_id] = bunk_name
+        if not was_occupied:
+            self.dispatch('on_bunk_changed', bunk_name, True)
+
+    # ⏰ Leave-date expiry
+    def _track_leave(self, tenant_id, leave_date):
+        if leave_date is None:
+            self.leave_by_tenant.pop(tenant_id, None)
+            return
+        if self.leave_by_tenant.get(tenant_id) == leave_date:
+            return
+        self.leave_by_tenant[tenant_id] = leave_date
+        heapq.heappush(self.expiries, (leave_date, tenant_id))
+        if self.expiries[0] == (leave_date, tenant_id):
+            self.schedule_expiry()  # the new date is sooner than the one being waited for
+
+    def schedule_expiry(self):
+        if self.expiry_event is not None:
+            self.expiry_event.cancel()
+            self.expiry_event = None
+        if not self.expiries:
+            return
+        # A stay ends at the first moment of its leave date (is_active: leave_date > today)
+        leave_date = self.expiries[0][0]
+        ends = datetime.combine(date.fromisoformat(leave_date), datetime.min.time())
+        delay = max(0, (ends - datetime.now()).total_seconds())
+        self.expiry_event = Clock.schedule_once(self.expire_due, min(delay, EXPIRY_RECHECK))
+
+    def expire_due(self, dt=None):
+        today = today_str()
+        while self.expiries and self.expiries[0][0] <= today:
+            leave_date, tenant_id = heapq.heappop(self.expiries)
+            if self.leave_by_tenant.get(tenant_id) != leave_date:
+                continue  # the leave date was changed or cleared since this entry was pushed
+            self._set_inactive(tenant_id)
+            self.dispatch('on_tenant_changed', tenant_id)
+        self.schedule_expiry()
+
+    def on_bunk_changed(self, bunk_name, occupied):
+        pass
+
+    def on_tenant_changed(self, tenant_id):
+        pass
+
+    def on_loaded(self):
+        pass
+
+
+occupancy = OccupancyModel()
+
+
+def apply_remote_changes(changes):
+    # Edits made at other desks, from the tenant service's change feed
+    for change in changes:
+        tenant_id = change['tenant_id']
+        if change['kind'] == 'added':
+            occupancy.tenant_added(tenant_id, change['bunk'])
+        elif change['kind'] == 'leave_date':
+            occupancy.leave_date_changed(tenant_id, change['leave_date'], change['bunk'])
+        elif change['kind'] == 'payment':
+            occupancy.payment_changed(tenant_id)
+        elif change['kind'] == 'removed':
+            occupancy.tenant_removed(tenant_id)
 
-# ✅ SQLite Setup
-conn = sqlite3.connect("tenants.db")
-cursor = conn.cursor()
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS tenants (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    room TEXT,
-    bunk TEXT,
-    name TEXT,
-    date TEXT,
-    number TEXT,
-    payment TEXT DEFAULT '',
-    leave_date TEXT DEFAULT ''
-)
-""")
 # 🏠 Menu Screen
+MENU_VIDEO = 'Mainmenu.mp4'
+MENU_POSTER = os.path.join(CACHE_DIR, 'Mainmenu_poster.png')  # captured from the video the first time it plays
+
+
 class MenuScreen(Screen):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
         layout = FloatLayout()
+        self.low_power = settings.LOW_POWER
+        self.video_allowed = False  # set by start_video, once the first frame is up
+
+        # Still poster, shown in low-power mode instead of the video
+        self.poster = Image(
+            allow_stretch=True,
+            keep_ratio=False,
+            size_hint=(1, 1),
+            pos_hint={'x': 0, 'y': 0},
+            opacity=0
+        )
+        layout.add_widget(self.poster)
 
-        # Add background image
-        background = Video(
-            source='Mainmenu.mp4',
+        # Add background video (the source is only set once it is allowed to play)
+        self.background = background = Video(
             state='play',
             options={'eos': 'loop'},
             volume=0,
@@ -52,17 +375,24 @@ class MenuScreen(Screen):
         )
         layout.add_widget(background)
 
-        # Create button panel
+        # Create button panel: one button per floor plan in layouts.json, then Tenant Info
+        targets = [(plan['title'], plan['name']) for plan in FLOOR_PLANS] + [("Tenant Info", "tenant_info"), ("Dashboard", "dashboard")]
         button_panel = BoxLayout(
             orientation='vertical',
             spacing=10,
             padding=10,
+            size_hint=(1, None)
+        )
+        button_panel.bind(minimum_height=button_panel.setter('height'))
+        # Scrolls once there are more rooms than fit on the screen
+        panel_scroll = ScrollView(
             size_hint=(0.5, None),
-            height=200,
+            height=min(60 * len(targets) + 20, 400),
             pos_hint={'center_x': 0.5, 'center_y': 0.5}
         )
+        panel_scroll.add_widget(button_panel)
 
-        for label, target in [("Unit 07","unit_a_room_a"),("U8 Room A", "room_a"), ("U8 Room B", "room_b"), ("Tenant Info", "tenant_info")]:
+        for label, target in targets:
             nav_button = Button(
                 text=label,
                 size_hint_y=None,
@@ -88,567 +418,526 @@ class MenuScreen(Screen):
             nav_button.bind(on_press=self.make_switch(target))
             button_panel.add_widget(nav_button)
 
-        layout.add_widget(button_panel)
+        layout.add_widget(panel_scroll)
         self.add_widget(layout)
 
+    def start_video(self):
+        self.video_allowed = True
+        if self.manager and self.manager.current == self.name:
+            self.show_background()
+
+    def show_background(self):
+        if self.low_power:
+            if os.path.exists(MENU_POSTER):
+                # Unload the decoder entirely; the poster costs nothing once it is on the GPU
+                self.background.source = ''
+                self.poster.source = MENU_POSTER
+                self.poster.opacity = 1
+            elif self.video_allowed:
+                # Low power from the very first launch: play just long enough to capture the poster
+                self.play_video()
+        elif self.video_allowed:
+            self.poster.opacity = 0
+            self.play_video()
+
+    def play_video(self):
+        if not self.background.source:
+            self.background.source = MENU_VIDEO
+            if not os.path.exists(MENU_POSTER):
+                self.background.bind(position=self.save_poster)
+        self.background.state = 'play'
+
+    def save_poster(self, video, position):
+        # Wait a second in, so the poster isn't a black fade-in frame
+        if position < 1 or video.texture is None:
+            return
+        video.unbind(position=self.save_poster)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            video.texture.save(MENU_POSTER, flipped=False)
+        except Exception as e:
+            print(f"Error saving menu poster: {e}")
+            return  # low power or not, the video keeps playing
+        if self.low_power:
+            self.show_background()  # swap the video for the poster just captured
+
+    def set_low_power(self, enabled):
+        self.low_power = enabled
+        if self.manager and self.manager.current == self.name:
+            self.show_background()
+
+    def on_enter(self):
+        self.show_background()
+
+    def on_leave(self):
+        # Nobody sees the menu from a room screen: stop decoding until we come back
+        if self.background.source:
+            self.background.state = 'pause'
+
     def make_switch(self, target_screen):
         def switch(instance):
             self.manager.current = target_screen
         return switch
-# 🛏️ Room A screen
-class RoomAScreen(Screen):
+# 🪪 Tenant popup: one instance shared by every room screen. Tenant cards are pooled and
+# rebound to new data on each open, so tapping through bunks builds no new widgets.
+class TenantCard(BoxLayout):
     def __init__(self, **kwargs):
-        super(RoomAScreen, self).__init__(**kwargs)
-        layout = FloatLayout()
-        self.bunk_buttons = {}
-        # Background image
-        layout.add_widget(Image(
-            source='room_a.png',
-            allow_stretch=True,
-            keep_ratio=False,
-            size_hint=(1, 1),
-            pos_hint={'x': 0, 'y': 0}
-        ))
-
-        # Bed buttons
-        from functools import partial
-
-        for bed_name, x, y in [
-            ('8U15', 0.05, 0.75), ('8L16', 0.05, 0.65), 
-            ('8U17', 0.27, 0.75), ('8L18', 0.27, 0.65), 
-            ('8U13', 0.56, 0.75), ('8L14', 0.56, 0.65),
-            ('8U11', 0.55, 0.50), ('8L12', 0.55, 0.40),
-            ('8U19', 0.12, 0.10), ('8L20', 0.30, 0.10),
-            ('8U21', 0.60, 0.10), ('8L22', 0.79, 0.10)
-        ]:
-            color = self.get_bunk_color(bed_name)
-            btn = Button(
-                text=bed_name,
-                size_hint=(0.15, 0.1),
-                pos_hint={'x': x, 'y': y},
-                background_color=color
-            )
-            btn.bind(on_release=partial(self.show_tenant_popup, bunk_name=bed_name))
-            layout.add_widget(btn)
-            self.bunk_buttons[bed_name] = btn
+        super().__init__(orientation='vertical', size_hint_y=None, height=300, spacing=10, **kwargs)
+        self.tenant_id = None
+        self.owner = None
+
+        self.label = Label(halign='left', valign='top', size_hint_y=None, height=160)
+        self.label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
+        self.add_widget(self.label)
+
+        self.payment_input = TextInput(hint_text="Payment received")
+        update_btn = Button(text="Add Payment", size_hint_x=0.3)
+        update_btn.bind(on_press=lambda x: self.owner.update_payment(self.tenant_id, self.payment_input.text))
+        payment_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
+        payment_row.add_widget(self.payment_input)
+        payment_row.add_widget(update_btn)
+        self.add_widget(payment_row)
+
+        self.leave_input = TextInput(hint_text="Leave Date (YYYY-MM-DD)")
+        leave_btn = Button(text="Set Leave", size_hint_x=0.3)
+        leave_btn.bind(on_press=lambda x: self.owner.update_leave_date(self.tenant_id, self.leave_input.text))
+        leave_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
+        leave_row.add_widget(self.leave_input)
+        leave_row.add_widget(leave_btn)
+        self.add_widget(leave_row)
+
+        delete_btn = Button(text="Delete Tenant", size_hint_y=None, height=40)
+        delete_btn.bind(on_press=lambda x: self.owner.delete_tenant(self.tenant_id))
+        self.add_widget(delete_btn)
+
+    def bind_tenant(self, owner, t):
+        info = (
+            f"Room: {t[1]}\n"
+            f"Bunk: {t[2]}\n"
+            f"Name: {t[3]}\n"
+            f"Date: {t[4]}\n"
+            f"Contact: {t[5]}\n"
+            f"Paid: ₱{t[6]:,.2f}\n"
+            f"Leave: {t[7] or 'N/A'}"
+        )
+        if t[0] != self.tenant_id or info != self.label.text:
+            self.payment_input.text = ''
+            self.leave_input.text = ''
+        self.owner = owner
+        self.tenant_id = t[0]
+        self.label.text = info
 
-        back_btn = Button(text="Back", size_hint=(1, None), height=50, pos_hint={'x': 0, 'y': 0})
-        back_btn.bind(on_release=lambda x: setattr(self.manager, 'current', 'menu'))
-        layout.add_widget(back_btn)
 
-        self.add_widget(layout)
+class AddTenantForm(BoxLayout):
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', size_hint_y=None, spacing=10, **kwargs)
+        self.bind(minimum_height=self.setter('height'))
+        self.owner = None
+        self.bunk_name = None
+
+        self.message = Label(size_hint_y=None, height=40)
+        self.add_widget(self.message)
+        self.add_widget(Label(text="Add New Tenant", size_hint_y=None, height=30))
+
+        self.name_input = TextInput(hint_text="Full Name", size_hint_y=None, height=40)
+        self.contact_input = TextInput(hint_text="Contact Number", size_hint_y=None, height=40)
+        self.date_input = TextInput(hint_text="Start Date (YYYY-MM-DD)", size_hint_y=None, height=40)
+        self.payment_input = TextInput(hint_text="Initial Payment", size_hint_y=None, height=40)
+        for text_input in (self.name_input, self.contact_input, self.date_input, self.payment_input):
+            self.add_widget(text_input)
+
+        add_btn = Button(text="Add Tenant", size_hint_y=None, height=40)
+        add_btn.bind(on_press=self.submit_tenant)
+        self.add_widget(add_btn)
+
+    def bind_bunk(self, owner, bunk_name):
+        if (owner, bunk_name) != (self.owner, self.bunk_name):
+            for text_input in (self.name_input, self.contact_input, self.date_input, self.payment_input):
+                text_input.text = ''
+        self.owner = owner
+        self.bunk_name = bunk_name
+        self.message.text = f"No active tenant in bunk {bunk_name}."
+
+    def submit_tenant(self, instance):
+        if not check_date(self.date_input.text, "Invalid Start Date"):
+            return  # the form stays open with everything typed so far
+        payment = 0.0  # blank or 0: no opening payment
+        if self.payment_input.text.strip() and parse_amount(self.payment_input.text) != 0:
+            payment = read_amount(self.payment_input.text)
+            if payment is None:
+                return
+        self.owner.add_tenant(
+            room=self.owner.floor_plan['room'], bunk=self.bunk_name,
+            name=self.name_input.text,
+            number=self.contact_input.text,
+            date=self.date_input.text,
+            payment=payment
+        )
+        get_tenant_popup().dismiss()
 
-    def get_bunk_color(self, bunk_name):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("SELECT leave_date FROM tenants WHERE bunk = ?", (bunk_name,))
-        tenants = cursor.fetchall()
-        for t in tenants:
-            leave = t[0]
-            if not leave or leave.strip() == '' or leave.strip().upper() == 'N/A' or leave > today:
-                return (1, 0, 0, 0.5)  # Red
-        return (0, 1, 0, 0.5)  # Green
-
-    def refresh_bunk_color(self, bunk_name):
-        if bunk_name in self.bunk_buttons:
-            self.bunk_buttons[bunk_name].background_color = self.get_bunk_color(bunk_name)
-
-    def show_tenant_popup(self, instance, bunk_name):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("""
-            SELECT id, room, bunk, name, date, number, payment, leave_date
-            FROM tenants
-            WHERE bunk = ?
-        """, (bunk_name,))
-        all_tenants = cursor.fetchall()
-
-        active_tenants = []
-        for t in all_tenants:
-            leave = t[7]
-            if not leave or leave.strip() == '' or leave.strip().upper() == 'N/A' or leave > today:
-                active_tenants.append(t)
 
-        scroll = ScrollView()
-        content_layout = BoxLayout(orientation='vertical', size_hint_y=None, padding=10, spacing=10)
-        content_layout.bind(minimum_height=content_layout.setter('height'))
+class TenantPopup(Popup):
+    def __init__(self, **kwargs):
+        super().__init__(size_hint=(0.9, 0.8), **kwargs)
+        self.owner = None
+        self.bunk_name = None
+        self.cards = []  # pool; grows to the most tenants ever shown in one bunk
+        self.add_form = AddTenantForm()
+        self.loading_label = Label(text="Loading…", size_hint_y=None, height=40)
+        self.request = None
 
-        popup = Popup(title=f"Tenant Info - {bunk_name}", size_hint=(0.9, 0.8))
+        self.close_btn = Button(text="Close", size_hint_y=None, height=40)
+        self.close_btn.bind(on_press=lambda x: self.dismiss())
 
+        scroll = ScrollView()
+        self.content_layout = BoxLayout(orientation='vertical', size_hint_y=None, padding=10, spacing=10)
+        self.content_layout.bind(minimum_height=self.content_layout.setter('height'))
+        scroll.add_widget(self.content_layout)
+        self.content = scroll
+
+    def show(self, owner, bunk_name):
+        self.owner = owner
+        self.bunk_name = bunk_name
+        self.title = f"Tenant Info - {bunk_name}"
+        self.content_layout.clear_widgets()
+        self.content_layout.add_widget(self.loading_label)
+        self.content_layout.add_widget(self.close_btn)
+        self.rebind()
+        occupancy.bind(on_tenant_changed=self.on_tenant_changed)
+        self.open()
+
+    def rebind(self):
+        # The cards shown stay up until the fresh query comes back; only the latest request is applied
+        self.request = request = run_db('active_tenants_in_bunk', self.bunk_name,
+                                        on_done=lambda tenants: self.request is request and self.fill(tenants),
+                                        error="Error loading tenants")
+
+    @profiling.profiled('build', 'tenant_popup')
+    def fill(self, active_tenants):
+        while len(self.cards) < len(active_tenants):
+            self.cards.append(TenantCard())
+
+        self.content_layout.clear_widgets()  # detaches only; the widgets stay in the pool
         if not active_tenants:
-            content_layout.add_widget(Label(
-                text=f"No active tenant in bunk {bunk_name}.",
-                size_hint_y=None, height=40
-            ))
-
-            content_layout.add_widget(Label(text="Add New Tenant", size_hint_y=None, height=30))
-
-            name_input = TextInput(hint_text="Full Name", size_hint_y=None, height=40)
-            contact_input = TextInput(hint_text="Contact Number", size_hint_y=None, height=40)
-            date_input = TextInput(hint_text="Start Date (YYYY-MM-DD)", size_hint_y=None, height=40)
-            payment_input = TextInput(hint_text="Initial Payment", size_hint_y=None, height=40)
-
-            content_layout.add_widget(name_input)
-            content_layout.add_widget(contact_input)
-            content_layout.add_widget(date_input)
-            content_layout.add_widget(payment_input)
-
-            def submit_tenant(instance):
-                self.add_tenant(
-                    room='1508', bunk=bunk_name,
-                    name=name_input.text,
-                    number=contact_input.text,
-                    date=date_input.text,
-                    payment=payment_input.text
-                )
-                self.refresh_bunk_color(bunk_name)
-                popup.dismiss()
-
-            add_btn = Button(text="Add Tenant", size_hint_y=None, height=40)
-            add_btn.bind(on_press=submit_tenant)
-            content_layout.add_widget(add_btn)
-
-        else:
-            for t in active_tenants:
-                info = (
-                    f"Room: {t[1]}\n"
-                    f"Bunk: {t[2]}\n"
-                    f"Name: {t[3]}\n"
-                    f"Date: {t[4]}\n"
-                    f"Contact: {t[5]}\n"
-                    f"Payment: ₱{t[6] if t[6] else '0.00'}\n"
-                    f"Leave: {t[7] or 'N/A'}"
-                )
-                label = Label(text=info, halign='left', valign='top', size_hint_y=None, height=160)
-                label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
-                content_layout.add_widget(label)
-
-                payment_input = TextInput(hint_text="Enter Payment")
-                update_btn = Button(text="Update", size_hint_x=0.3)
-                update_btn.bind(on_press=lambda x, tid=t[0], inp=payment_input: self.update_payment(tid, inp.text))
-                payment_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-                payment_row.add_widget(payment_input)
-                payment_row.add_widget(update_btn)
-                content_layout.add_widget(payment_row)
-
-                leave_input = TextInput(hint_text="Leave Date (YYYY-MM-DD)")
-                leave_btn = Button(text="Set Leave", size_hint_x=0.3)
-                leave_btn.bind(on_press=lambda x, tid=t[0], inp=leave_input: self.update_leave_date(tid, inp.text))
-                leave_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-                leave_row.add_widget(leave_input)
-                leave_row.add_widget(leave_btn)
-                content_layout.add_widget(leave_row)
-
-                delete_btn = Button(text="Delete Tenant", size_hint_y=None, height=40)
-                delete_btn.bind(on_press=lambda x, tid=t[0]: self.delete_tenant(tid))
-                content_layout.add_widget(delete_btn)
-
-        close_btn = Button(text="Close", size_hint_y=None, height=40)
-        close_btn.bind(on_press=lambda x: popup.dismiss())
-        content_layout.add_widget(close_btn)
+            self.add_form.bind_bunk(self.owner, self.bunk_name)
+            self.content_layout.add_widget(self.add_form)
+        for card, t in zip(self.cards, active_tenants):
+            card.bind_tenant(self.owner, t)
+            self.content_layout.add_widget(card)
+        self.content_layout.add_widget(self.close_btn)
 
-        scroll.add_widget(content_layout)
-        popup.content = scroll
-        popup.open()
+    def on_tenant_changed(self, model, tenant_id):
+        # Keep the open popup in step with edits made from its own cards
+        self.rebind()
 
-    def add_tenant(self, room, bunk, name, number, date, payment):
-        try:
-            cursor.execute("""
-                INSERT INTO tenants (room, bunk, name, number, date, payment)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (room, bunk, name, number, date, float(payment) if payment else 0.0))
-            conn.commit()
-        except Exception as e:
-            print(f"Error adding tenant: {e}")
+    def on_dismiss(self):
+        self.request = None
+        occupancy.unbind(on_tenant_changed=self.on_tenant_changed)
 
-    def update_payment(self, tenant_id, amount):
-        try:
-            cursor.execute("UPDATE tenants SET payment = ? WHERE id = ?", (float(amount), tenant_id))
-            conn.commit()
-        except Exception as e:
-            print(f"Error updating payment: {e}")
 
-    def update_leave_date(self, tenant_id, leave_date):
-        try:
-            cursor.execute("UPDATE tenants SET leave_date = ? WHERE id = ?", (leave_date, tenant_id))
-            conn.commit()
-        except Exception as e:
-            print(f"Error updating leave date: {e}")
+tenant_popup = None
 
-    def delete_tenant(self, tenant_id):
-        try:
-            cursor.execute("DELETE FROM tenants WHERE id = ?", (tenant_id,))
-            conn.commit()
-        except Exception as e:
-            print(f"Error deleting tenant: {e}")
-class UnitARoomAScreen(Screen):
-    def __init__(self, **kwargs):
-        super(UnitARoomAScreen, self).__init__(**kwargs)
-        layout = FloatLayout()
-        self.bunk_buttons = {}
-        # Background image
-        layout.add_widget(Image(
-            source='UnitA.png',
-            allow_stretch=True,
-            keep_ratio=False,
-            size_hint=(1, 1),
-            pos_hint={'x': 0, 'y': 0}
-        ))
-
-        # Bed buttons
-        from functools import partial
-
-        for bed_name, x, y in [
-            ('7U07', 0.33, 0.70), ('7L08', 0.43, 0.70), 
-            ('7U09', 0.27, 0.63), ('7L10', 0.27, 0.58), 
-            ('7U05', 0.43, 0.63), ('7L06', 0.43, 0.58),
-            ('7U03', 0.55, 0.70), ('7L04', 0.65, 0.70),
-            ('7U01', 0.67, 0.63), ('7L02', 0.67, 0.58),
-            ('7U15', 0.27, 0.35), ('7L16', 0.27, 0.29),
-            ('7U13', 0.37, 0.26), ('7L14', 0.47, 0.26),
-            ('7U13', 0.60, 0.26), ('7L12', 0.70, 0.26),
-        ]:
-            color = self.get_bunk_color(bed_name)
-            btn = Button(
-                text=bed_name,
-                size_hint=(0.10, 0.05),
-                pos_hint={'x': x, 'y': y},
-                background_color=color
-            )
-            btn.bind(on_release=partial(self.show_tenant_popup, bunk_name=bed_name))
-            layout.add_widget(btn)
-            self.bunk_buttons[bed_name] = btn
 
-        back_btn = Button(text="Back", size_hint=(1, None), height=50, pos_hint={'x': 0, 'y': 0})
-        back_btn.bind(on_release=lambda x: setattr(self.manager, 'current', 'menu'))
-        layout.add_widget(back_btn)
+def get_tenant_popup():
+    global tenant_popup
+    if tenant_popup is None:
+        tenant_popup = TenantPopup()
+    return tenant_popup
 
-        self.add_widget(layout)
 
-    def get_bunk_color(self, bunk_name):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("SELECT leave_date FROM tenants WHERE bunk = ?", (bunk_name,))
-        tenants = cursor.fetchall()
-        for t in tenants:
-            leave = t[0]
-            if not leave or leave.strip() == '' or leave.strip().upper() == 'N/A' or leave > today:
-                return (1, 0, 0, 0.5)  # Red
-        return (0, 1, 0, 0.5)  # Green
-
-    def refresh_bunk_color(self, bunk_name):
-        if bunk_name in self.bunk_buttons:
-            self.bunk_buttons[bunk_name].background_color = self.get_bunk_color(bunk_name)
-
-    def show_tenant_popup(self, instance, bunk_name):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("""
-            SELECT id, room, bunk, name, date, number, payment, leave_date
-            FROM tenants
-            WHERE bunk = ?
-        """, (bunk_name,))
-        all_tenants = cursor.fetchall()
-
-        active_tenants = []
-        for t in all_tenants:
-            leave = t[7]
-            if not leave or leave.strip() == '' or leave.strip().upper() == 'N/A' or leave > today:
-                active_tenants.append(t)
+# 🗺️ Floor-plan view: the background plus every bunk marker on one canvas, a Color and a Rectangle
+# per bunk with its name baked into a texture, so a recolor just changes one Color. Pan and zoom
+# move the Scatter's transform only, and taps are looked up in a BunkGrid: no widget per bunk.
+TAP_DISTANCE = 10  # pixels a touch may drift and still count as a tap
+ZOOM_STEP = 1.2  # per mouse-wheel notch
+label_textures = {}
 
-        scroll = ScrollView()
-        content_layout = BoxLayout(orientation='vertical', size_hint_y=None, padding=10, spacing=10)
-        content_layout.bind(minimum_height=content_layout.setter('height'))
 
-        popup = Popup(title=f"Tenant Info - {bunk_name}", size_hint=(0.9, 0.8))
+def label_texture(text):
+    if text not in label_textures:
+        label = CoreLabel(text=text, font_size=14)
+        label.refresh()
+        label_textures[text] = label.texture
+    return label_textures[text]
 
-        if not active_tenants:
-            content_layout.add_widget(Label(
-                text=f"No active tenant in bunk {bunk_name}.",
-                size_hint_y=None, height=40
-            ))
-
-            content_layout.add_widget(Label(text="Add New Tenant", size_hint_y=None, height=30))
-
-            name_input = TextInput(hint_text="Full Name", size_hint_y=None, height=40)
-            contact_input = TextInput(hint_text="Contact Number", size_hint_y=None, height=40)
-            date_input = TextInput(hint_text="Start Date (YYYY-MM-DD)", size_hint_y=None, height=40)
-            payment_input = TextInput(hint_text="Initial Payment", size_hint_y=None, height=40)
-
-            content_layout.add_widget(name_input)
-            content_layout.add_widget(contact_input)
-            content_layout.add_widget(date_input)
-            content_layout.add_widget(payment_input)
-
-            def submit_tenant(instance):
-                self.add_tenant(
-                    room='1507', bunk=bunk_name,
-                    name=name_input.text,
-                    number=contact_input.text,
-                    date=date_input.text,
-                    payment=payment_input.text
-                )
-                self.refresh_bunk_color(bunk_name)
-                popup.dismiss()
-
-            add_btn = Button(text="Add Tenant", size_hint_y=None, height=40)
-            add_btn.bind(on_press=submit_tenant)
-            content_layout.add_widget(add_btn)
 
-        else:
-            for t in active_tenants:
-                info = (
-                    f"Room: {t[1]}\n"
-                    f"Bunk: {t[2]}\n"
-                    f"Name: {t[3]}\n"
-                    f"Date: {t[4]}\n"
-                    f"Contact: {t[5]}\n"
-                    f"Payment: ₱{t[6] if t[6] else '0.00'}\n"
-                    f"Leave: {t[7] or 'N/A'}"
-                )
-                label = Label(text=info, halign='left', valign='top', size_hint_y=None, height=160)
-                label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
-                content_layout.add_widget(label)
-
-                payment_input = TextInput(hint_text="Enter Payment")
-                update_btn = Button(text="Update", size_hint_x=0.3)
-                update_btn.bind(on_press=lambda x, tid=t[0], inp=payment_input: self.update_payment(tid, inp.text))
-                payment_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-                payment_row.add_widget(payment_input)
-                payment_row.add_widget(update_btn)
-                content_layout.add_widget(payment_row)
-
-                leave_input = TextInput(hint_text="Leave Date (YYYY-MM-DD)")
-                leave_btn = Button(text="Set Leave", size_hint_x=0.3)
-                leave_btn.bind(on_press=lambda x, tid=t[0], inp=leave_input: self.update_leave_date(tid, inp.text))
-                leave_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-                leave_row.add_widget(leave_input)
-                leave_row.add_widget(leave_btn)
-                content_layout.add_widget(leave_row)
-
-                delete_btn = Button(text="Delete Tenant", size_hint_y=None, height=40)
-                delete_btn.bind(on_press=lambda x, tid=t[0]: self.delete_tenant(tid))
-                content_layout.add_widget(delete_btn)
+class FloorPlanView(Scatter):
+    __events__ = ('on_bunk_press',)
 
-        close_btn = Button(text="Close", size_hint_y=None, height=40)
-        close_btn.bind(on_press=lambda x: popup.dismiss())
-        content_layout.add_widget(close_btn)
-
-        scroll.add_widget(content_layout)
-        popup.content = scroll
-        popup.open()
-
-    def add_tenant(self, room, bunk, name, number, date, payment):
-        try:
-            cursor.execute("""
-                INSERT INTO tenants (room, bunk, name, number, date, payment)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (room, bunk, name, number, date, float(payment) if payment else 0.0))
-            conn.commit()
-        except Exception as e:
-            print(f"Error adding tenant: {e}")
-
-    def update_payment(self, tenant_id, amount):
-        try:
-            cursor.execute("UPDATE tenants SET payment = ? WHERE id = ?", (float(amount), tenant_id))
-            conn.commit()
-        except Exception as e:
-            print(f"Error updating payment: {e}")
-
-    def update_leave_date(self, tenant_id, leave_date):
-        try:
-            cursor.execute("UPDATE tenants SET leave_date = ? WHERE id = ?", (leave_date, tenant_id))
-            conn.commit()
-        except Exception as e:
-            print(f"Error updating leave date: {e}")
+    def __init__(self, floor_plan, **kwargs):
+        super().__init__(do_rotation=False, scale_min=1, scale_max=6, auto_bring_to_front=False, **kwargs)
+        self.bunks = floor_plan['bunks']
+        self.marker_size = floor_plan['button_size']
+        self.grid = BunkGrid(self.bunks, self.marker_size)
+        self.background = AsyncImage(
+            source=image_source(floor_plan['background']),
+            allow_stretch=True,
+            keep_ratio=False,
+            size_hint=(None, None),
+        )
+        self.add_widget(self.background)
+
+        self.colors = {}
+        self.markers = {}
+        self.labels = {}
+        with self.canvas:  # after the background's canvas, so the markers draw on top of it
+            for bunk, x, y in self.bunks:
+                self.colors[bunk] = Color(*bunk_color(occupancy.is_occupied(bunk)))
+                self.markers[bunk] = Rectangle()
+            Color(1, 1, 1, 1)
+            for bunk, x, y in self.bunks:
+                self.labels[bunk] = Rectangle(texture=label_texture(bunk))
+        self.bind(size=self.layout_markers, on_transform_with_touch=lambda *args: self.keep_in_view())
+
+    def layout_markers(self, *args):
+        width, height = self.size
+        self.background.size = self.size
+        marker_width, marker_height = self.marker_size[0] * width, self.marker_size[1] * height
+        for bunk, x, y in self.bunks:
+            self.markers[bunk].pos = (x * width, y * height)
+            self.markers[bunk].size = (marker_width, marker_height)
+            label = self.labels[bunk]
+            label.size = label.texture.size
+            label.pos = (x * width + (marker_width - label.size[0]) / 2, y * height + (marker_height - label.size[1]) / 2)
+
+    def set_bunk_color(self, bunk, rgba):
+        if bunk in self.colors:
+            self.colors[bunk].rgba = rgba
+
+    def color_bunks(self, color_of):
+        for bunk, color in self.colors.items():
+            color.rgba = color_of(bunk)
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return False
+        if touch.is_mouse_scrolling:
+            self.zoom(ZOOM_STEP if touch.button == 'scrolldown' else 1 / ZOOM_STEP, touch.pos)
+            return True
+        # A second finger makes it a pinch: neither finger is a tap any more
+        touch.ud['bunk_tap'] = not self._touches
+        for other in self._touches:
+            other.ud['bunk_tap'] = False
+        return super().on_touch_down(touch)
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is self and touch.ud.get('bunk_tap'):
+            if abs(touch.x - touch.ox) <= TAP_DISTANCE and abs(touch.y - touch.oy) <= TAP_DISTANCE:
+                x, y = self.to_local(*touch.pos)
+                bunk = self.grid.hit(x / self.width, y / self.height)
+                if bunk is not None:
+                    self.dispatch('on_bunk_press', bunk)
+        return super().on_touch_up(touch)
+
+    def on_bunk_press(self, bunk):
+        pass
+
+    def zoom(self, factor, anchor):
+        scale = min(self.scale_max, max(self.scale_min, self.scale * factor))
+        step = scale / self.scale
+        self.apply_transform(Matrix().scale(step, step, step), anchor=self.to_local(*anchor))
+        self.keep_in_view()
+
+    def keep_in_view(self):
+        # Zoomed in, the plan can be dragged around but never off the screen
+        if self.parent is None:
+            return
+        (x, y), (width, height) = self.bbox
+        parent = self.parent
+        x = min(parent.x, max(x, parent.right - width))
+        y = min(parent.y, max(y, parent.top - height))
+        if (x, y) != tuple(self.bbox[0]):
+            self.pos = (x, y)
 
-    def delete_tenant(self, tenant_id):
-        try:
-            cursor.execute("DELETE FROM tenants WHERE id = ?", (tenant_id,))
-            conn.commit()
-        except Exception as e:
-            print(f"Error deleting tenant: {e}")
 
-# 🛏️ Room B screen
-class RoomBScreen(Screen):
-    def __init__(self, **kwargs):
-        super(RoomBScreen, self).__init__(**kwargs)
+# 🛏️ Floor-plan screen: one class for every room, driven by a layout from layouts.json
+class FloorPlanScreen(Screen):
+    def __init__(self, floor_plan, **kwargs):
+        super().__init__(**kwargs)
+        self.floor_plan = floor_plan
         layout = FloatLayout()
-        self.bunk_buttons = {}
-        # Background image
-        
-        layout.add_widget(Image(
-            source='room_b.png',
-            allow_stretch=True,
-            keep_ratio=False,
-            size_hint=(1, 1),
-            pos_hint={'x': 0, 'y': 0}
-        ))
-
-        # Bed buttons
-        from functools import partial
-
-        for bed_name, x, y in [
-            ('8U09', 0.47, 0.62),('8L10', 0.63, 0.62), 
-            ('8U07', 0.47, 0.47), ('8L08', 0.63, 0.47), 
-            ('8U05', 0.47, 0.34), ('8L06', 0.63, 0.34),
-            ('8U01', 0.12, 0.46), ('8L02', 0.12, 0.36),
-            ('8U03', 0.12, 0.24), ('8L04', 0.30, 0.24),
-        ]:
-            color = self.get_bunk_color(bed_name)
-            btn = Button(
-                text=bed_name,
-                size_hint=(0.15, 0.1),
-                pos_hint={'x': x, 'y': y},
-                background_color=color
-            )
-            btn.bind(on_release=partial(self.show_tenant_popup, bunk_name=bed_name))
-            layout.add_widget(btn)
-            self.bunk_buttons[bed_name] = btn
+        # Background and bunk markers, colored from the shared occupancy model (loaded once, with a single query)
+        self.plan_view = FloorPlanView(floor_plan, size_hint=(1, 1))
+        self.plan_view.bind(on_bunk_press=self.show_tenant_popup)
+        layout.add_widget(self.plan_view)
+        self.background = self.plan_view.background
+        self.background.bind(on_load=self.on_background_loaded)
+        self.background_requested = None
 
         back_btn = Button(text="Back", size_hint=(1, None), height=50, pos_hint={'x': 0, 'y': 0})
         back_btn.bind(on_release=lambda x: setattr(self.manager, 'current', 'menu'))
         layout.add_widget(back_btn)
 
+        # 🕰️ View as of date: colors the bunks by who was staying on that day instead of today
+        as_of_bar = BoxLayout(size_hint=(0.6, None), height=40, pos_hint={'right': 1, 'top': 1}, spacing=5)
+        self.as_of_input = TextInput(hint_text="YYYY-MM-DD", multiline=False)
+        self.as_of_input.bind(on_text_validate=lambda x: self.as_of_toggle.state == 'down' and self.show_as_of())
+        self.as_of_toggle = ToggleButton(text="View as of", size_hint_x=0.5)
+        self.as_of_toggle.bind(state=self.on_as_of_toggle)
+        as_of_bar.add_widget(self.as_of_toggle)
+        as_of_bar.add_widget(self.as_of_input)
+        layout.add_widget(as_of_bar)
+        self.as_of = None  # date being shown, None for live occupancy
+
         self.add_widget(layout)
+        occupancy.bind(on_bunk_changed=self.update_bunk_marker, on_loaded=self.update_all_markers)
+
+    def on_pre_enter(self):
+        self.background_requested = time.perf_counter()
+        self.background.source = image_source(self.floor_plan['background'])
 
-    def get_bunk_color(self, bunk_name):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("SELECT leave_date FROM tenants WHERE bunk = ?", (bunk_name,))
-        tenants = cursor.fetchall()
-        for t in tenants:
-            leave = t[0]
-            if not leave or leave.strip() == '' or leave.strip().upper() == 'N/A' or leave > today:
-                return (1, 0, 0, 0.5)  # Red
-        return (0, 1, 0, 0.5)  # Green
-
-    def refresh_bunk_color(self, bunk_name):
-        if bunk_name in self.bunk_buttons:
-            self.bunk_buttons[bunk_name].background_color = self.get_bunk_color(bunk_name)
-
-    def show_tenant_popup(self, instance, bunk_name):
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("""
-            SELECT id, room, bunk, name, date, number, payment, leave_date
-            FROM tenants
-            WHERE bunk = ?
-        """, (bunk_name,))
-        all_tenants = cursor.fetchall()
-
-        active_tenants = []
-        for t in all_tenants:
-            leave = t[7]
-            if not leave or leave.strip() == '' or leave.strip().upper() == 'N/A' or leave > today:
-                active_tenants.append(t)
+    def on_background_loaded(self, image):
+        if profiling.profiler is not None and self.background_requested is not None:
+            ms = (time.perf_counter() - self.background_requested) * 1000
+            profiling.profiler.record('texture', self.name, ms)
+        self.background_requested = None
 
-        scroll = ScrollView()
-        content_layout = BoxLayout(orientation='vertical', size_hint_y=None, padding=10, spacing=10)
-        content_layout.bind(minimum_height=content_layout.setter('height'))
+    def on_leave(self):
+        release_image(self.background)
 
-        popup = Popup(title=f"Tenant Info - {bunk_name}", size_hint=(0.9, 0.8))
+    def update_bunk_marker(self, model, bunk_name, occupied):
+        if self.as_of is None:
+            self.plan_view.set_bunk_color(bunk_name, bunk_color(occupied))
 
-        if not active_tenants:
-            content_layout.add_widget(Label(
-                text=f"No active tenant in bunk {bunk_name}.",
-                size_hint_y=None, height=40
-            ))
-
-            content_layout.add_widget(Label(text="Add New Tenant", size_hint_y=None, height=30))
-
-            name_input = TextInput(hint_text="Full Name", size_hint_y=None, height=40)
-            contact_input = TextInput(hint_text="Contact Number", size_hint_y=None, height=40)
-            date_input = TextInput(hint_text="Start Date (YYYY-MM-DD)", size_hint_y=None, height=40)
-            payment_input = TextInput(hint_text="Initial Payment", size_hint_y=None, height=40)
-
-            content_layout.add_widget(name_input)
-            content_layout.add_widget(contact_input)
-            content_layout.add_widget(date_input)
-            content_layout.add_widget(payment_input)
-
-            def submit_tenant(instance):
-                self.add_tenant(
-                    room='1508', bunk=bunk_name,
-                    name=name_input.text,
-                    number=contact_input.text,
-                    date=date_input.text,
-                    payment=payment_input.text
-                )
-                self.refresh_bunk_color(bunk_name)
-                popup.dismiss()
-
-            add_btn = Button(text="Add Tenant", size_hint_y=None, height=40)
-            add_btn.bind(on_press=submit_tenant)
-            content_layout.add_widget(add_btn)
+    def update_all_markers(self, model):
+        if self.as_of is not None:
+            return
+        self.plan_view.color_bunks(lambda bunk_name: bunk_color(model.is_occupied(bunk_name)))
 
+    def on_as_of_toggle(self, instance, state):
+        if state == 'down':
+            self.show_as_of()
         else:
-            for t in active_tenants:
-                info = (
-                    f"Room: {t[1]}\n"
-                    f"Bunk: {t[2]}\n"
-                    f"Name: {t[3]}\n"
-                    f"Date: {t[4]}\n"
-                    f"Contact: {t[5]}\n"
-                    f"Payment: ₱{t[6] if t[6] else '0.00'}\n"
-                    f"Leave: {t[7] or 'N/A'}"
-                )
-                label = Label(text=info, halign='left', valign='top', size_hint_y=None, height=160)
-                label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
-                content_layout.add_widget(label)
-
-                payment_input = TextInput(hint_text="Enter Payment")
-                update_btn = Button(text="Update", size_hint_x=0.3)
-                update_btn.bind(on_press=lambda x, tid=t[0], inp=payment_input: self.update_payment(tid, inp.text))
-                payment_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-                payment_row.add_widget(payment_input)
-                payment_row.add_widget(update_btn)
-                content_layout.add_widget(payment_row)
-
-                leave_input = TextInput(hint_text="Leave Date (YYYY-MM-DD)")
-                leave_btn = Button(text="Set Leave", size_hint_x=0.3)
-                leave_btn.bind(on_press=lambda x, tid=t[0], inp=leave_input: self.update_leave_date(tid, inp.text))
-                leave_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-                leave_row.add_widget(leave_input)
-                leave_row.add_widget(leave_btn)
-                content_layout.add_widget(leave_row)
-
-                delete_btn = Button(text="Delete Tenant", size_hint_y=None, height=40)
-                delete_btn.bind(on_press=lambda x, tid=t[0]: self.delete_tenant(tid))
-                content_layout.add_widget(delete_btn)
+            self.as_of = None
+            self.update_all_markers(occupancy)
 
-        close_btn = Button(text="Close", size_hint_y=None, height=40)
-        close_btn.bind(on_press=lambda x: popup.dismiss())
-        content_layout.add_widget(close_btn)
+    def show_as_of(self):
+        try:
+            as_of = parse_date(self.as_of_input.text) or today_str()
+        except ValueError as e:
+            print(f"Error reading date: {e}")
+            return
+        self.as_of = as_of
+        self.as_of_input.text = as_of
+        self.plan_view.color_bunks(lambda bunk_name: bunk_color(None))
+        run_db('active_bunks_at', as_of, on_done=lambda rows: self.color_as_of(as_of, rows),
+               error="Error loading occupancy")
 
-        scroll.add_widget(content_layout)
-        popup.content = scroll
-        popup.open()
+    def color_as_of(self, as_of, rows):
+        if as_of != self.as_of:
+            return  # toggled off, or another date was entered meanwhile
+        occupied = {bunk for tenant_id, bunk in rows}
+        self.plan_view.color_bunks(lambda bunk_name: bunk_color(bunk_name in occupied))
+
+    def show_tenant_popup(self, view, bunk_name):
+        get_tenant_popup().show(self, bunk_name)
 
     def add_tenant(self, room, bunk, name, number, date, payment):
-        try:
-            cursor.execute("""
-                INSERT INTO tenants (room, bunk, name, number, date, payment)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (room, bunk, name, number, date, float(payment) if payment else 0.0))
-            conn.commit()
-        except Exception as e:
-            print(f"Error adding tenant: {e}")
+        run_db('add_tenant', room, bunk, name, number, date, payment,
+               on_done=lambda tenant_id: occupancy.tenant_added(tenant_id, bunk),
+               error="Error adding tenant")
 
-    def update_payment(self, tenant_id, amount):
-        try:
-            cursor.execute("UPDATE tenants SET payment = ? WHERE id = ?", (float(amount), tenant_id))
-            conn.commit()
-        except Exception as e:
-            print(f"Error updating payment: {e}")
+    def update_payment(self, tenant_id, text):
+        amount = read_amount(text)
+        if amount is None:
+            return
+        run_db('record_payment', tenant_id, amount,
+               on_done=lambda result: occupancy.payment_changed(tenant_id),
+               error="Error updating payment")
 
     def update_leave_date(self, tenant_id, leave_date):
-        try:
-            cursor.execute("UPDATE tenants SET leave_date = ? WHERE id = ?", (leave_date, tenant_id))
-            conn.commit()
-        except Exception as e:
-            print(f"Error updating leave date: {e}")
+        if not check_date(leave_date, "Invalid Leave Date"):
+            return
+        run_db('update_leave_date', tenant_id, leave_date,
+               on_done=lambda leave_date: occupancy.leave_date_changed(tenant_id, leave_date),
+               error="Error updating leave date")
 
     def delete_tenant(self, tenant_id):
-        try:
-            cursor.execute("DELETE FROM tenants WHERE id = ?", (tenant_id,))
-            conn.commit()
-        except Exception as e:
-            print(f"Error deleting tenant: {e}")
+        run_db('delete_tenant', tenant_id,
+               on_done=lambda result: occupancy.tenant_removed(tenant_id),
+               error="Error deleting tenant")
+
+
+# 🧾 Tenant Info rows: plain data records, drawn by a handful of recycled TenantRow widgets
+def tenant_record(tenant):
+    return {
+        'tenant_id': tenant[0],
+        'summary': (
+            f"Room: {tenant[1]}\n"
+            f"Bunk: {tenant[2]}\n"
+            f"Name: {tenant[3]}\n"
+            f"Move in: {tenant[4]}\n"
+            f"Contact: {tenant[5]}\n"
+            f"Move out: {tenant[7] or 'N/A'}\n"
+            f"Paid: ₱{tenant[6]:,.2f}"
+        ),
+    }
+
+
+class TenantRow(RecycleDataViewBehavior, BoxLayout):
+    def __init__(self, **kwargs):
+        super().__init__(orientation='vertical', padding=5, spacing=5, **kwargs)
+        self.tenant_id = None
+        self.owner = None
+
+        self.label = Label(halign='left', valign='top', size_hint_y=None, height=160)
+        self.label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
+        self.add_widget(self.label)
+
+        # 💰 Payment row
+        payment_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
+        self.payment_input = TextInput(hint_text="Payment received")
+        update_btn = Button(text="Add Payment", size_hint_x=0.3)
+        update_btn.bind(on_press=lambda x: self.owner.update_payment(self.tenant_id, self.payment_input.text))
+        payment_row.add_widget(self.payment_input)
+        payment_row.add_widget(update_btn)
+        self.add_widget(payment_row)
+
+        # 🏃 Leave row
+        leave_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
+        self.leave_input = TextInput(hint_text="Leave Date")
+        leave_btn = Button(text="Set Leave", size_hint_x=0.3)
+        leave_btn.bind(on_press=lambda x: self.owner.update_leave_date(self.tenant_id, self.leave_input.text))
+        leave_row.add_widget(self.leave_input)
+        leave_row.add_widget(leave_btn)
+        self.add_widget(leave_row)
+
+        # ❌ Delete row
+        delete_row = BoxLayout(size_hint_y=None, height=40)
+        delete_btn = Button(text="Delete", size_hint_x=1)
+        delete_btn.bind(on_press=lambda x: self.owner.delete_tenant(self.tenant_id))
+        delete_row.add_widget(delete_btn)
+        self.add_widget(delete_row)
+
+    def refresh_view_attrs(self, rv, index, data):
+        if data['tenant_id'] != self.tenant_id or data['summary'] != self.label.text:
+            # Recycled for another tenant, or this one was just updated: clear the inputs
+            self.payment_input.text = ''
+            self.leave_input.text = ''
+        self.owner = rv.owner
+        self.tenant_id = data['tenant_id']
+        self.label.text = data['summary']
+        return super().refresh_view_attrs(rv, index, data)
+
+
+class TenantList(RecycleView):
+    def __init__(self, owner, **kwargs):
+        super().__init__(**kwargs)
+        self.owner = owner
+        layout = RecycleBoxLayout(
+            orientation='vertical', size_hint_y=None, spacing=20, padding=10,
+            default_size=(None, 300), default_size_hint=(1, None)
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        self.viewclass = TenantRow  # stored on the layout manager, so it has to come after add_widget
+
+
+SEARCH_LIMIT = 50
+PAGE_SIZE = 50  # tenants fetched per page; more are fetched as the list nears its end
+SORT_OPTIONS = {"Name": "name", "Room": "room", "Bunk": "bunk", "Move in": "date"}
+
+
 # 📋 Tenant Info Screen
 class TenantInfoScreen(Screen):
     def __init__(self, **kwargs):
@@ -659,7 +948,7 @@ class TenantInfoScreen(Screen):
             Color(0, 0, 0, 1)
             self.bg_rect = Rectangle(size=root.size, pos=root.pos)
 
-        bg = Image(source='tenantinfo.png', allow_stretch=True, keep_ratio=False)
+        bg = Image(source=image_source('tenantinfo.png'), allow_stretch=True, keep_ratio=False)
         root.add_widget(bg)
 
         
@@ -671,21 +960,34 @@ class TenantInfoScreen(Screen):
         top_section = BoxLayout(orientation='vertical', size_hint_y=None, height=100, padding=10, spacing=10)
         title = Label(text="Tenant Info", size_hint_y=None, height=40)
         search_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-        self.search_input = TextInput(hint_text="Search by name")
+        self.search_input = TextInput(hint_text="Search by name, bunk, room or contact", multiline=False)
+        self.search_query = ''
+        # Debounced: the query runs once typing pauses, not on every keystroke
+        self.search_trigger = Clock.create_trigger(self.run_search, 0.3)
+        self.search_input.bind(text=self.on_search_text)
         search_btn = Button(text="Search", size_hint_x=0.3)
         search_btn.bind(on_press=self.search_tenant_popup)
+        self.sort = "name"
+        sort_spinner = Spinner(text="Name", values=list(SORT_OPTIONS), size_hint_x=0.3)
+        sort_spinner.bind(text=self.on_sort)
         search_row.add_widget(self.search_input)
         search_row.add_widget(search_btn)
+        search_row.add_widget(sort_spinner)
         top_section.add_widget(title)
         top_section.add_widget(search_row)
         foreground.add_widget(top_section)
 
-        # 📜 Middle section: Scrollable tenant list
-        scroll = ScrollView()
-        self.layout = BoxLayout(orientation='vertical', size_hint_y=None, spacing=10, padding=10)
-        self.layout.bind(minimum_height=self.layout.setter('height'))
-        scroll.add_widget(self.layout)
-        foreground.add_widget(scroll)
+        # 📜 Middle section: Scrollable tenant list (only the rows on screen exist as widgets)
+        self.empty_label = Label(text="No active tenants found.", size_hint_y=None, height=0, opacity=0)
+        foreground.add_widget(self.empty_label)
+        self.tenant_list = TenantList(owner=self)
+        self.tenant_list.bind(scroll_y=self.on_scroll)
+        foreground.add_widget(self.tenant_list)
+        self.loaded_day = None
+        self.loading = False
+        self.request = None  # the page being fetched, if any
+        self.next_page = None  # where the next page starts; None once the last one is in
+        occupancy.bind(on_tenant_changed=self.patch_row, on_loaded=self.on_occupancy_reloaded)
 
         # 🔙 Bottom section: Fixed Back button
         bottom_section = BoxLayout(size_hint_y=None, height=60, padding=10)
@@ -701,89 +1003,137 @@ class TenantInfoScreen(Screen):
         self.bg_rect.pos = instance.po
 
     def on_pre_enter(self):
-        self.refresh()
+        # Edits are patched in as they happen; a full reload is only needed once a day,
+        # when tenants whose leave date has arrived drop off the list
+        if self.loaded_day != today_str():
+            self.refresh()
 
-    def refresh(self):
-        self.layout.clear_widgets()
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("""
-            SELECT id, room, bunk, name, date, number, payment, leave_date
-            FROM tenants
-            WHERE leave_date IS NULL OR leave_date = '' OR leave_date > ?
-        """, (today,))
-        tenants = cursor.fetchall()
+    def on_occupancy_reloaded(self, model):
+        if self.loaded_day is not None:
+            self.refresh()  # the tenant service lost track of changes; start over
 
-        if not tenants:
-            self.layout.add_widget(Label(text="No active tenants found.", size_hint_y=None, height=40))
-
-        for tenant in tenants:
-            box = BoxLayout(orientation='vertical', size_hint_y=None, padding=5, spacing=5)
-            box.height = 300
-
-            summary = (
-                f"Room: {tenant[1]}\n"
-                f"Bunk: {tenant[2]}\n"
-                f"Name: {tenant[3]}\n"
-                f"Move in: {tenant[4]}\n"
-                f"Contact: {tenant[5]}\n"
-                f"Move out: {tenant[7] or 'N/A'}\n"
-                f"Payment: ₱{tenant[6] if tenant[6] else '0.00'}"
-            )
+    def refresh(self):
+        # Start over from the first page; a page still on its way is dropped when it arrives
+        self.loaded_day = today_str()
+        self.loading = True
+        self.next_page = None
+        self.update_empty_label()
+        self.request_page(first=True)
+
+    def request_page(self, first=False):
+        after = None if first else self.next_page
+        request = run_db('active_tenants_page', self.sort, after, PAGE_SIZE, search=self.search_query or None,
+                         on_done=lambda page: self.show_page(request, page, first),
+                         error="Error searching tenants" if self.search_query else "Error loading tenants")
+        self.request = request
+
+    def on_scroll(self, instance, scroll_y):
+        # Fetch the next page while there is still about a screenful left to scroll
+        if self.request is not None or self.next_page is None:
+            return
+        hidden = self.tenant_list.children[0].height - self.tenant_list.height
+        if hidden <= 0 or scroll_y * hidden < self.tenant_list.height:
+            self.request_page()
+
+    @profiling.profiled('build', 'tenant_info_rows')
+    def show_page(self, request, page, first):
+        if request is not self.request:
+            return  # a newer search or sort was picked while this one ran
+        rows, self.next_page = page
+        self.request = None
+        self.loading = False
+        records = [self.sorted_record(t) for t in rows]
+        if first:
+            self.tenant_list.data = records
+        else:
+            self.tenant_list.data.extend(records)
+        self.update_empty_label()
+
+    def sorted_record(self, tenant):
+        record = tenant_record(tenant)
+        record['key'] = self.list_key(page_key(tenant, self.sort))
+        return record
+
+    def list_key(self, key):
+        # The list's order in Python terms: names compare case-insensitively, as in the query
+        value, tenant_id = key
+        return (value.lower() if self.sort == "name" else value, tenant_id)
+
+    def on_sort(self, spinner, text):
+        if SORT_OPTIONS[text] != self.sort:
+            self.sort = SORT_OPTIONS[text]
+            self.tenant_list.scroll_y = 1
+            if self.loaded_day is not None:
+                self.refresh()
+
+    def on_search_text(self, instance, text):
+        self.search_trigger.cancel()
+        self.search_trigger()
+
+    def run_search(self, dt):
+        query = self.search_input.text.strip()
+        if len(query) < 2:
+            query = ''  # one letter matches nearly everyone; show the full list instead
+        if query != self.search_query:
+            self.search_query = query
+            self.tenant_list.scroll_y = 1
+            self.refresh()
+
+    def update_empty_label(self):
+        has_rows = bool(self.tenant_list.data) and not self.loading
+        if self.loading:
+            self.empty_label.text = "Searching…" if self.search_query else "Loading tenants…"
+        else:
+            self.empty_label.text = "No tenant found with that name or bunk." if self.search_query else "No active tenants found."
+        self.empty_label.height = 0 if has_rows else 40
+        self.empty_label.opacity = 0 if has_rows else 1
+
+    def find_row(self, tenant_id):
+        for index, record in enumerate(self.tenant_list.data):
+            if record['tenant_id'] == tenant_id:
+                return index
+        return None
+
+    def patch_row(self, model, tenant_id):
+        # Apply one tenant's change as a diff: only that record is re-fetched and only its row repaints
+        if self.loaded_day is None:
+            return
+        run_db('get_tenant', tenant_id, on_done=lambda tenant: self.apply_patch(tenant_id, tenant),
+               error="Error loading tenant")
+
+    def apply_patch(self, tenant_id, tenant):
+        index = self.find_row(tenant_id)
+        data = self.tenant_list.data
+        if tenant is None or not is_active(tenant[7], today_str()):
+            if index is not None:
+                data.pop(index)
+        elif index is None:
+            if not self.search_query:  # a filtered list only ever loses rows between searches
+                self.insert_sorted(self.sorted_record(tenant))
+        else:
+            data[index] = self.sorted_record(tenant)
+        self.update_empty_label()
 
-            label = Label(text=summary, halign='left', valign='top', size_hint_y=None, height=160)
-            label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
-            box.add_widget(label)
-
-            # 💰 Payment row
-            payment_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-            payment_input = TextInput(hint_text="Enter Payment")
-            update_btn = Button(text="Update", size_hint_x=0.3)
-            update_btn.bind(on_press=lambda x, tid=tenant[0], inp=payment_input: self.update_payment(tid, inp.text))
-            payment_row.add_widget(payment_input)
-            payment_row.add_widget(update_btn)
-            box.add_widget(payment_row)
-
-            # 🏃 Leave row
-            leave_row = BoxLayout(size_hint_y=None, height=40, spacing=5)
-            leave_input = TextInput(hint_text="Leave Date")
-            leave_btn = Button(text="Set Leave", size_hint_x=0.3)
-            leave_btn.bind(on_press=lambda x, tid=tenant[0], inp=leave_input: self.update_leave_date(tid, inp.text))
-            leave_row.add_widget(leave_input)
-            leave_row.add_widget(leave_btn)
-            box.add_widget(leave_row)
-
-            # ❌ Delete row
-            delete_row = BoxLayout(size_hint_y=None, height=40)
-            delete_btn = Button(text="Delete", size_hint_x=1)
-            delete_btn.bind(on_press=lambda x, tid=tenant[0]: self.delete_tenant(tid))
-            delete_row.add_widget(delete_btn)
-            box.add_widget(delete_row)
-
-            self.layout.add_widget(box)
-            spacer = Label(size_hint_y=None, height=20)
-            self.layout.add_widget(spacer)
-
-        # 🔙 Back button
-        # back_btn = Button(text="Back", size_hint_y=None, height=40)
-        # back_btn.bind(on_press=self.go_back)
-        # self.layout.add_widget(back_btn)
+    def insert_sorted(self, record):
+        # Only into the pages already loaded; a tenant that sorts later arrives with its page
+        if self.next_page is not None and record['key'] > self.list_key(self.next_page):
+            return
+        data = self.tenant_list.data
+        index = next((i for i, other in enumerate(data) if other['key'] > record['key']), len(data))
+        data.insert(index, record)
 
     def search_tenant_popup(self, instance):
-        query = self.search_input.text.strip().lower()
+        query = self.search_input.text.strip()
         if not query:
             return
 
-        today = datetime.today().strftime("%Y-%m-%d")
-        cursor.execute("""
-            SELECT room, bunk, name, date, number, payment, leave_date
-            FROM tenants
-            WHERE (leave_date IS NULL OR leave_date = '' OR leave_date > ?)
-        """, (today,))
-        tenants = cursor.fetchall()
-
-        # Match against name or bunk
-        matches = [t for t in tenants if query in t[2].strip().lower() or query in t[1].strip().lower()]
+        # Ranked full-text match on name, bunk, room and contact number
+        run_db('search_active_tenants', query, limit=SEARCH_LIMIT,
+               on_done=lambda tenants: self.show_search_popup([t[1:] for t in tenants]),
+               error="Error searching tenants")
 
+    @profiling.profiled('build', 'search_popup')
+    def show_search_popup(self, matches):
         if not matches:
             popup = Popup(title="No Match Found",
                         content=Label(text="No tenant found with that name or bunk."),
@@ -803,8 +1153,8 @@ class TenantInfoScreen(Screen):
                 f"Name: {t[2]}\n"
                 f"Move in: {t[3]}\n"
                 f"Contact: {t[4]}\n"
-                f"Move out: ₱{t[5] if t[5] else '0.00'}\n"
-                f"Leave: {t[6] or 'N/A'}"
+                f"Paid: ₱{t[5]:,.2f}\n"
+                f"Move out: {t[6] or 'N/A'}"
             )
             label = Label(text=info, halign='left', valign='top', size_hint_y=None, height=160)
             label.bind(size=lambda instance, value: setattr(instance, 'text_size', (instance.width, None)))
@@ -819,45 +1169,308 @@ class TenantInfoScreen(Screen):
         popup = Popup(title="Tenant Info", content=scroll, size_hint=(0.9, 0.8))
         popup.open()
             
-    def update_payment(self, tenant_id, payment):
-        if not payment.strip().replace('.', '', 1).isdigit():
+    def update_payment(self, tenant_id, text):
+        amount = read_amount(text)
+        if amount is None:
             return
-        cursor.execute("UPDATE tenants SET payment = ? WHERE id = ?", (payment, tenant_id))
-        conn.commit()
-        self.refresh()
+        run_db('record_payment', tenant_id, amount,
+               on_done=lambda result: occupancy.payment_changed(tenant_id),
+               error="Error updating payment")
 
     def update_leave_date(self, tenant_id, leave_date):
-        cursor.execute("UPDATE tenants SET leave_date = ? WHERE id = ?", (leave_date, tenant_id))
-        conn.commit()
-        self.refresh()
+        if not check_date(leave_date, "Invalid Leave Date"):
+            return
+        run_db('update_leave_date', tenant_id, leave_date,
+               on_done=lambda leave_date: occupancy.leave_date_changed(tenant_id, leave_date),
+               error="Error updating leave date")
 
     def delete_tenant(self, tenant_id):
-        cursor.execute("DELETE FROM tenants WHERE id = ?", (tenant_id,))
-        conn.commit()
-        self.refresh()
+        run_db('delete_tenant', tenant_id,
+               on_done=lambda result: occupancy.tenant_removed(tenant_id),
+               error="Error deleting tenant")
 
     def go_back(self, instance):
         self.manager.current = "menu"
 
-# 🚀 App Entry Point
 
-class BedSpaceApp(App):
-    def build(self):
-        sm = ScreenManager()
+# 📊 Dashboard: occupancy and payments per room and month, read only from the rollup tables the
+# database keeps current, so it opens just as fast with ten years of history as with ten tenants
+DASHBOARD_MONTHS = 6
+
+
+class DashboardScreen(Screen):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        layout = BoxLayout(orientation='vertical', padding=10, spacing=10)
+        layout.add_widget(Label(text="Dashboard", size_hint_y=None, height=40))
+        self.status_label = Label(text="Loading…", size_hint_y=None, height=30)
+        layout.add_widget(self.status_label)
+
+        scroll = ScrollView()
+        self.table = GridLayout(cols=2 + DASHBOARD_MONTHS, size_hint_y=None, row_default_height=30, spacing=2)
+        self.table.bind(minimum_height=self.table.setter('height'))
+        scroll.add_widget(self.table)
+        layout.add_widget(scroll)
+
+        back_btn = Button(text="Back", size_hint_y=None, height=50)
+        back_btn.bind(on_press=lambda x: setattr(self.manager, 'current', 'menu'))
+        layout.add_widget(back_btn)
+        self.add_widget(layout)
 
-        # Add all screens to the same ScreenManager instance
-        sm.add_widget(MenuScreen(name="menu"))
-        sm.add_widget(TenantInfoScreen(name="tenant_info"))
-        sm.add_widget(UnitARoomAScreen(name="unit_a_room_a"))  # New layout with image and buttons
-        sm.add_widget(RoomAScreen(name="room_a"))  # New layout with image and buttons
-        sm.add_widget(RoomBScreen(name="room_b"))  # New layout with image and buttons
+        self.request = None
+        # Edits while the dashboard is showing refresh it once they settle
+        self.refresh_trigger = Clock.create_trigger(lambda dt: self.refresh(), 1)
+        occupancy.bind(on_tenant_changed=self.on_data_changed, on_loaded=self.on_data_changed)
 
+    def on_pre_enter(self):
+        self.refresh()
 
+    def on_data_changed(self, model, *args):
+        if self.manager and self.manager.current == self.name:
+            self.refresh_trigger()
+
+    def refresh(self):
+        request = run_db(room_dashboard, DASHBOARD_MONTHS, on_done=lambda data: self.show(request, data),
+                         error="Error loading dashboard")
+        self.request = request
+
+    @profiling.profiled('build', 'dashboard')
+    def show(self, request, data):
+        if request is not self.request:
+            return
+        months = data['months']
+        occupied = dict(data['current'])
+        average = {(room, month): tenants for room, month, tenants in data['occupancy']}
+        collected = {(room, month): (total, count) for room, month, total, count in data['payments']}
+        rooms = sorted(set(ROOM_BUNKS) | set(occupied) | {room for room, _ in collected})
+
+        self.table.clear_widgets()
+        self.add_row("Occupancy", "Now", *[month for month in months])
+        for room in rooms:
+            bunks = ROOM_BUNKS.get(room)
+            now = occupied.get(room, 0)
+            self.add_row(
+                room_title(room, bunks),
+                f"{now}/{bunks}" if bunks else str(now),
+                *[occupancy_rate(average.get((room, month), 0), bunks) for month in months],
+            )
+        self.add_row("Payments", "", *[month for month in months])
+        for room in rooms:
+            self.add_row(room_title(room, ROOM_BUNKS.get(room)), "",
+                         *[f"₱{collected[room, month][0]:,.0f}" if (room, month) in collected else "-" for month in months])
+        totals = [sum(collected[room, month][0] for room in rooms if (room, month) in collected) for month in months]
+        self.add_row("Total", "", *[f"₱{total:,.0f}" for total in totals])
+        self.status_label.text = f"Updated {datetime.now():%H:%M}; occupancy is the month's average"
+
+    def add_row(self, *cells):
+        for text in cells:
+            self.table.add_widget(Label(text=text))
+
+
+def room_title(room, bunks):
+    if not room:
+        return "(no room)"
+    return f"{room} ({bunks} bunks)" if bunks else room
+
+
+def occupancy_rate(tenants, bunks):
+    # Share of the room's bunks in use on an average day; tenant count when the room has no layout
+    return f"{tenants / bunks:.0%}" if bunks else f"{tenants:.1f}"
+
+
+# 🗂️ Screen registry: each screen is built the first time it is shown
+def screen_factories():
+    return {
+        "menu": MenuScreen,
+        "tenant_info": TenantInfoScreen,
+        "dashboard": DashboardScreen,
+        **{plan['name']: partial(FloorPlanScreen, plan) for plan in FLOOR_PLANS},
+    }
+
+STARTUP_BUDGET_MS = 1500
+
+
+class LazyScreenManager(ScreenManager):
+    def __init__(self, factories, **kwargs):
+        self.factories = factories
+        super().__init__(**kwargs)
+
+    def get_screen(self, name):
+        if not self.has_screen(name) and name in self.factories:
+            if profiling.profiler is None:
+                self.add_widget(self.factories[name](name=name))
+            else:
+                started = time.perf_counter()
+                self.add_widget(self.factories[name](name=name))
+                ms = (time.perf_counter() - started) * 1000
+                profiling.profiler.record('build', f"screen {name}", ms)
+                print(f"Built screen {name} in {ms:.0f} ms")
+        return super().get_screen(name)
+
+
+# 🔬 Profiling overlay (BEDSPACE_PROFILE=1): frame times, slowest statements and builds, refreshed every second
+class ProfileOverlay(BoxLayout):
+    def __init__(self, profiler, **kwargs):
+        super().__init__(orientation='vertical', size_hint=(0.6, 0.45), pos_hint={'x': 0, 'top': 1}, **kwargs)
+        self.profiler = profiler
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self.bg_rect = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=lambda instance, value: setattr(self.bg_rect, 'pos', value),
+                  size=lambda instance, value: setattr(self.bg_rect, 'size', value))
+
+        self.label = Label(halign='left', valign='top', font_size='11sp')
+        self.label.bind(size=lambda instance, value: setattr(instance, 'text_size', value))
+        self.add_widget(self.label)
+        save_btn = Button(text="Save profile", size_hint_y=None, height=30)
+        save_btn.bind(on_press=lambda x: self.save())
+        self.add_widget(save_btn)
+        Clock.schedule_interval(self.refresh, 1)
+
+    def refresh(self, dt):
+        if not self.parent:
+            return
+        lines = []
+        frames = self.profiler.frame_stats()
+        if frames:
+            lines.append(f"{frames['fps']} fps  p50 {frames['p50_ms']} ms  p95 {frames['p95_ms']} ms  "
+                         f"max {frames['max_ms']} ms  janky {frames['over_33_ms']}/{frames['frames']}")
+        for category in ('sql', 'db', 'build', 'texture'):
+            for _, name, count, total, worst in self.profiler.top(category, limit=3):
+                lines.append(f"[{category}] {total:.0f} ms / {count} (max {worst:.0f}) {profiling.short_name(name)}")
+        if self.profiler.slow_queries:
+            at, ms, sql = self.profiler.slow_queries[-1]
+            lines.append(f"last slow query {at}: {ms} ms {sql[:60]}")
+        self.label.text = "\n".join(lines)
+
+    def save(self):
+        try:
+            print(f"Profile saved to {self.profiler.dump(settings.PROFILE_FILE)}")
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+
+
+# 🚀 App Entry Point
+
+class BedSpaceApp(App):
+    def build(self):
+        self.build_started = time.perf_counter()
+        load_floor_plans()
+        sm = LazyScreenManager(screen_factories())
+        sm.current = "menu"
+        self.build_finished = time.perf_counter()
         return sm
-BedSpaceApp().run()
+
+    def on_start(self):
+        self.root_window.bind(on_flip=self.on_first_frame)
+        if profiling.profiler is not None:
+            self.start_profiling(profiling.profiler)
+
+    def start_profiling(self, profiler):
+        Clock.schedule_interval(lambda dt: profiler.frame(dt * 1000), 0)  # runs once per frame
+        self.profile_overlay = ProfileOverlay(profiler)
+        self.root_window.add_widget(self.profile_overlay)
+        self.root_window.bind(on_keyboard=self.toggle_profile_overlay)
+
+    def toggle_profile_overlay(self, window, key, *args):
+        if key != 293:  # F12
+            return False
+        if self.profile_overlay.parent:
+            window.remove_widget(self.profile_overlay)
+        else:
+            window.add_widget(self.profile_overlay)
+        return True
+
+    def on_first_frame(self, window):
+        window.unbind(on_flip=self.on_first_frame)
+        self.report_startup(time.perf_counter())
+        Clock.schedule_once(self.preload, 0)
+
+    def report_startup(self, first_frame):
+        total_ms = (first_frame - STARTUP_T0) * 1000
+        print(
+            f"Cold start: {total_ms:.0f} ms to first frame "
+            f"(imports/setup {(self.build_started - STARTUP_T0) * 1000:.0f} ms, "
+            f"build {(self.build_finished - self.build_started) * 1000:.0f} ms, "
+            f"window/first draw {(first_frame - self.build_finished) * 1000:.0f} ms)"
+        )
+        if total_ms > STARTUP_BUDGET_MS:
+            print(f"Cold start is over the {STARTUP_BUDGET_MS} ms budget")
+
+    def preload(self, dt):
+        if settings.SERVER_URL:
+            self.change_follower = ChangeFollower(
+                settings.SERVER_URL, CLIENT_ID,
+                on_changes=lambda changes: Clock.schedule_once(lambda dt: apply_remote_changes(changes)),
+                on_reset=lambda: Clock.schedule_once(lambda dt: occupancy.load()),
+                token=settings.SERVER_TOKEN,
+            ).start()
+        elif settings.BACKUP_HOURS > 0:
+            # Snapshots are copied on their own thread, a few pages at a time, so the UI never waits
+            self.backups = BackupSchedule(
+                "tenants.db", settings.BACKUP_DIR, settings.BACKUP_HOURS, settings.BACKUP_KEEP, settings.BACKUP_DAYS
+            ).start()
+        occupancy.ensure_loaded()
+        self.root.get_screen("menu").start_video()
+        if settings.MEASURE_IDLE_CPU:
+            Clock.schedule_once(lambda dt: self.measure_idle_cpu(settings.MEASURE_IDLE_CPU), 2)
+        threading.Thread(target=self.prepare_assets, args=(tuple(self.root_window.size),), daemon=True).start()
+
+    def prepare_assets(self, window_size):
+        # Off the UI thread: Pillow scales and packs the images, then Kivy's loader threads decode
+        # the results so the first visit to each room finds its background already cached
+        try:
+            ui_atlas.update(build_ui_atlas(UI_IMAGES))
+            scaled = [prescale_background(source, window_size) for source in BACKGROUND_IMAGES]
+        except Exception as e:
+            print(f"Error preparing images: {e}")
+            return
+        Clock.schedule_once(lambda dt: [Loader.image(source) for source in scaled])
+
+    def measure_idle_cpu(self, seconds):
+        # Process CPU time (all threads, so video decoding counts) over wall time, on the idle menu:
+        # first in the configured mode, then in the other one
+        menu = self.root.get_screen("menu")
+        self.root.current = "menu"
+        modes = [menu.low_power, not menu.low_power]
+        results = []
+
+        def start_phase(dt):
+            menu.set_low_power(modes[len(results)])
+            Clock.schedule_once(begin_sample, 1)  # let the video open/close before sampling
+
+        def begin_sample(dt):
+            started = (time.perf_counter(), time.process_time())
+            Clock.schedule_once(lambda dt: end_sample(started), seconds)
+
+        def end_sample(started):
+            wall = time.perf_counter() - started[0]
+            cpu = time.process_time() - started[1]
+            results.append(cpu / wall * 100)
+            if len(results) < len(modes):
+                start_phase(0)
+                return
+            menu.set_low_power(modes[0])
+            for low_power, percent in zip(modes, results):
+                label = "poster (low power)" if low_power else "video"
+                print(f"Idle CPU on menu with {label}: {percent:.1f}% of one core over {seconds:.0f} s")
+
+        start_phase(0)
+
+    def on_stop(self):
+        if getattr(self, 'change_follower', None):
+            self.change_follower.stop()
+        if getattr(self, 'backups', None):
+            self.backups.stop()
+        if db is not None:
+            db.close()
+        if profiling.profiler is not None:
+            self.profile_overlay.save()
+if __name__ == '__main__':
+    BedSpaceApp().run()
 # class TestApp(App):
 #     def build(self):
-#         return UnitARoomAScreen()
+#         return FloorPlanScreen(FLOOR_PLANS[0])
 
 # TestApp().run()
 
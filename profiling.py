@@ -0,0 +1,189 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+
+# 🔬 Optional instrumentation (BEDSPACE_PROFILE=1): every SQL statement, screen/popup build and
+# frame is timed into one Profiler. Kivy-free, so the worker thread and the CLI can use it too.
+class Profiler:
+    def __init__(self, slow_query_ms=50.0, max_frames=600, max_slow=200):
+        self.slow_query_ms = slow_query_ms
+        self.lock = threading.Lock()  # SQL is timed on the worker thread, frames on the UI thread
+        self.timings = {}  # (category, name) -> [count, total ms, max ms]
+        self.slow_queries = deque(maxlen=max_slow)
+        self.frames = deque(maxlen=max_frames)  # ms per frame, most recent last
+        self.started = time.time()
+
+    def record(self, category, name, ms, count=1):
+        with self.lock:
+            entry = self.timings.setdefault((category, name), [0, 0.0, 0.0])
+            entry[0] += count
+            entry[1] += ms
+            entry[2] = max(entry[2], ms)
+
+    def slow_query(self, sql, ms):
+        sql = " ".join(sql.split())
+        with self.lock:
+            self.slow_queries.append((time.strftime("%H:%M:%S"), round(ms, 1), sql))
+        print(f"Slow query ({ms:.0f} ms): {sql[:200]}")
+
+    def frame(self, ms):
+        with self.lock:
+            self.frames.append(ms)
+
+    def frame_stats(self):
+        with self.lock:
+            frames = sorted(self.frames)
+        if not frames:
+            return None
+        total = sum(frames)
+        return {
+            "frames": len(frames),
+            "fps": round(len(frames) * 1000 / total, 1) if total else 0,
+            "p50_ms": round(frames[len(frames) // 2], 1),
+            "p95_ms": round(frames[min(len(frames) - 1, len(frames) * 95 // 100)], 1),
+            "max_ms": round(frames[-1], 1),
+            "over_33_ms": sum(1 for ms in frames if ms > 33.4),
+        }
+
+    def top(self, category=None, limit=5):
+        # [(category, name, count, total ms, max ms)] by total time
+        with self.lock:
+            rows = [(c, n, *entry) for (c, n), entry in self.timings.items() if category in (None, c)]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return rows[:limit]
+
+    def report(self):
+        with self.lock:
+            slow = list(self.slow_queries)
+        return {
+            "since": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.started)),
+            "frames": self.frame_stats(),
+            "timings": [
+                {"category": c, "name": n, "count": count, "total_ms": round(total, 2), "max_ms": round(worst, 2)}
+                for c, n, count, total, worst in self.top(limit=None)
+            ],
+            "slow_queries": [{"at": at, "ms": ms, "sql": sql} for at, ms, sql in slow],
+        }
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+profiler = None  # set by enable(); stays None when profiling is off
+
+
+def enable(slow_query_ms=50.0):
+    global profiler
+    if profiler is None:
+        profiler = Profiler(slow_query_ms)
+    return profiler
+
+
+class timed:
+    # with timed("build", "tenant_popup"): ...  — a no-op unless profiling is enabled
+    def __init__(self, category, name):
+        self.category = category
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if profiler is not None:
+            profiler.record(self.category, self.name, (time.perf_counter() - self.started) * 1000)
+
+
+def profiled(category, name):
+    # Decorator form of timed, for timing a whole method
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with timed(category, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# 🗄️ SQLite hooks: pass TimedConnection as the connection factory. A statement's time is its
+# execute() plus any fetchone/fetchmany/fetchall; rows read by iterating the cursor are not counted.
+def statement_name(sql):
+    # The whole statement, whitespace collapsed: many share a long prefix (the tenant column list)
+    return " ".join(sql.split())
+
+
+def short_name(name, width=60):
+    # For display only: a long SELECT keeps its first table and its WHERE clause, which is what
+    # tells statements apart (the column list and joins are shared by many)
+    if len(name) > width and name.startswith("SELECT ") and " FROM " in name:
+        rest = name.split(" FROM ", 1)[1]
+        where = rest.find(" WHERE ")
+        name = f"SELECT … FROM {rest.split(' ', 1)[0]}" + (f" …{rest[where:]}" if where >= 0 else "")
+    return name if len(name) <= width else name[:width - 1] + "…"
+
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+
+    def _timed(self, run, sql, parameters):
+        self.sql = sql
+        self.elapsed = 0.0
+        self.logged = False
+        started = time.perf_counter()
+        try:
+            return run(sql, parameters)
+        finally:
+            self._add((time.perf_counter() - started) * 1000, count=1)
+
+    def _add(self, ms, count=0):
+        if profiler is None or getattr(self, "sql", None) is None:
+            return
+        self.elapsed += ms
+        profiler.record("sql", statement_name(self.sql), ms, count)
+        if self.elapsed >= profiler.slow_query_ms and not self.logged:
+            self.logged = True
+            profiler.slow_query(self.sql, self.elapsed)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            self._add((time.perf_counter() - started) * 1000)
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            self._add((time.perf_counter() - started) * 1000)
+
+    def fetchall(self):
+        started = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            self._add((time.perf_counter() - started) * 1000)
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,127 @@
+import json
+import threading
+import time
+import uuid
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+from server import POLL_TIMEOUT, READ_METHODS, TOKEN_HEADER, WRITE_METHODS
+
+
+# 📡 Client side of server.py: RemoteRepository has the TenantRepository methods the app uses,
+# each one a POST to the service, so the database worker can run against either.
+REQUEST_TIMEOUT = 10
+
+
+def auth_headers(token):
+    return {TOKEN_HEADER: token} if token else {}
+
+
+class RemoteRepository:
+    def __init__(self, url, client_id=None, token=""):
+        self.url = url.rstrip("/")
+        self.client_id = client_id or uuid.uuid4().hex  # the change feed tags our own edits with this
+        self.token = token
+
+    def __getattr__(self, method):
+        if method not in READ_METHODS and method not in WRITE_METHODS:
+            raise AttributeError(method)
+        return lambda *args, **kwargs: self.call(method, args, kwargs)
+
+    def call(self, method, args=(), kwargs=None):
+        body = json.dumps({"args": list(args), "kwargs": kwargs or {}}).encode("utf-8")
+        request = Request(f"{self.url}/api/{method}", data=body, method="POST", headers={
+            "Content-Type": "application/json", "X-Client-Id": self.client_id, **auth_headers(self.token),
+        })
+        try:
+            with urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                return json.load(response)["result"]
+        except HTTPError as e:
+            error = read_error(e)
+            if e.code == 401:
+                raise PermissionError(f"tenant service at {self.url} refused us: {error} (check BEDSPACE_SERVER_TOKEN)") from None
+            # Same exception types the local repository raises, so callers handle both alike
+            raise (ValueError if e.code == 400 else RuntimeError)(error) from None
+        except URLError as e:
+            raise ConnectionError(f"tenant service at {self.url} is unreachable: {e.reason}") from None
+
+    # The service commits every write itself
+    def has_pending_writes(self):
+        return False
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def read_error(error):
+    try:
+        return json.load(error)["error"]
+    except (ValueError, KeyError):
+        return f"HTTP {error.code}"
+
+
+class ChangeFollower:
+    # Long-polls /api/changes on its own thread. on_changes(changes) gets every batch of other
+    # clients' edits; on_reset() means changes were missed (or the server restarted): reload.
+    def __init__(self, url, client_id, on_changes, on_reset, retry_delay=5, token=""):
+        self.url = url.rstrip("/")
+        self.client_id = client_id
+        self.token = token
+        self.on_changes = on_changes
+        self.on_reset = on_reset
+        self.retry_delay = retry_delay
+        self.epoch = None
+        self.seq = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="change-feed", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.poll()
+            except (URLError, OSError, ValueError) as e:
+                print(f"Error following tenant changes: {e}")
+                self.stopped.wait(self.retry_delay)
+
+    def poll(self):
+        # First contact returns at once with the current position; after that the request waits
+        query = urlencode({"since": self.seq or 0, "timeout": 0 if self.seq is None else POLL_TIMEOUT})
+        request = Request(f"{self.url}/api/changes?{query}", headers=auth_headers(self.token))
+        with urlopen(request, timeout=POLL_TIMEOUT + REQUEST_TIMEOUT) as response:
+            feed = json.load(response)
+        if self.seq is None:
+            # First contact: start from now; the app loads its state itself
+            self.epoch, self.seq = feed["epoch"], feed["seq"]
+            return
+        if feed["reset"] or feed["epoch"] != self.epoch:
+            self.epoch, self.seq = feed["epoch"], feed["seq"]
+            self.on_reset()
+            return
+        self.seq = feed["seq"]
+        changes = [change for change in feed["changes"] if change.get("client") != self.client_id]
+        if changes:
+            self.on_changes(changes)
+
+
+def wait_for_server(url, timeout=10):
+    # For scripts and tests that start the service and then talk to it
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urlopen(f"{url.rstrip('/')}/health", timeout=1):
+                return True
+        except (URLError, OSError):
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.1)
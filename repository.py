@@ -0,0 +1,778 @@
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+
+
+# 📅 Dates are stored as ISO 'YYYY-MM-DD' text (sorts like a date) or a real NULL when unknown/open-ended.
+# Each accepted format comes with a cheap shape check, so strptime only runs on a format that can match
+# (a failing strptime is slow, and migrations/imports see hundreds of thousands of values).
+DATE_FORMATS = (
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}$"), "%Y-%m-%d"),
+    (re.compile(r"\d{4}/\d{1,2}/\d{1,2}$"), "%Y/%m/%d"),
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{4}$"), "%m/%d/%Y"),
+    (re.compile(r"\d{1,2}-\d{1,2}-\d{4}$"), "%m-%d-%Y"),
+    (re.compile(r"\d{1,2} [A-Za-z]{3} \d{4}$"), "%d %b %Y"),
+    (re.compile(r"[A-Za-z]{3} \d{1,2}, \d{4}$"), "%b %d, %Y"),
+    (re.compile(r"[A-Za-z]+ \d{1,2}, \d{4}$"), "%B %d, %Y"),
+)
+
+
+@lru_cache(maxsize=4096)  # migrations and imports see the same dates over and over
+def parse_date(text):
+    if text is None or text.strip() == '' or text.strip().upper() == 'N/A':
+        return None
+    text = text.strip()
+    if len(text) == 10 and text[4] == text[7] == '-':
+        try:
+            return date.fromisoformat(text).isoformat()  # already ISO: no strptime needed
+        except ValueError:
+            pass
+    for shape, fmt in DATE_FORMATS:
+        if shape.match(text):
+            try:
+                return datetime.strptime(text, fmt).strftime("%Y-%m-%d")
+            except ValueError:
+                pass
+    raise ValueError(f"unrecognised date {text!r}, expected YYYY-MM-DD")
+
+
+def parse_date_or_null(text):
+    # Used when migrating old rows: anything unreadable was already treated as "still staying"
+    try:
+        return parse_date(text)
+    except ValueError:
+        return None
+
+
+def search_terms(text):
+    # Every word the user typed must prefix-match some word of name, bunk, room or contact number
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text.lower()))
+
+
+def parse_amount(text):
+    # Old payment cells hold floats, "1,500", "₱500" or junk; junk counts as nothing paid
+    try:
+        return float(str(text).replace("₱", "").replace(",", "").strip())
+    except ValueError:
+        return None
+
+
+def today_str():
+    return datetime.today().strftime("%Y-%m-%d")
+
+
+def now_str():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def is_active(leave_date, today):
+    return leave_date is None or leave_date > today
+
+
+# 🔁 Schema migrations, tracked with PRAGMA user_version
+def keep_legacy_values(db, field, column, unreadable):
+    # Raw values a migration cannot convert are copied to legacy_values before they are dropped,
+    # so nothing typed into the old app is lost; returns how many were kept
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS legacy_values (
+            tenant_id INTEGER NOT NULL,
+            field TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (tenant_id, field)
+        )
+    """)
+    kept = db.execute(f"""
+        INSERT OR REPLACE INTO legacy_values (tenant_id, field, value)
+        SELECT id, ?, {column} FROM tenants WHERE {unreadable}
+    """, (field,)).rowcount
+    if kept:
+        print(f"Migration: {kept} unreadable {field} value(s) kept in legacy_values")
+    return kept
+
+
+def migrate_to_typed_dates(db):
+    db.create_function("parse_date_or_null", 1, parse_date_or_null, deterministic=True)
+    for column in ("date", "leave_date"):
+        keep_legacy_values(db, column, column, f"""
+            {column} IS NOT NULL AND parse_date_or_null({column}) IS NULL AND UPPER(TRIM({column})) NOT IN ('', 'N/A')
+        """)
+    seq = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tenants'").fetchone()
+    db.execute("DROP INDEX IF EXISTS idx_tenants_bunk_leave")
+    db.execute("""
+        CREATE TABLE tenants_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room TEXT,
+            bunk TEXT,
+            name TEXT,
+            date TEXT CHECK (date IS NULL OR date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'),
+            number TEXT,
+            payment TEXT DEFAULT '',
+            leave_date TEXT CHECK (leave_date IS NULL OR leave_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]')
+        )
+    """)
+    db.execute("""
+        INSERT INTO tenants_new (id, room, bunk, name, date, number, payment, leave_date)
+        SELECT id, room, bunk, name, parse_date_or_null(date), number, payment, parse_date_or_null(leave_date)
+        FROM tenants
+    """)
+    db.execute("DROP TABLE tenants")
+    db.execute("ALTER TABLE tenants_new RENAME TO tenants")
+    if seq is not None:
+        # Keep ids of deleted tenants from being handed out again
+        db.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tenants'", seq)
+
+    # Covers the per-room occupancy lookup: bunk IN (...) reads leave_date straight from the index
+    db.execute("CREATE INDEX idx_tenants_bunk_leave ON tenants (bunk, leave_date)")
+    # "Who is active today" (leave_date IS NULL OR leave_date > today) is answered from these two:
+    # a partial index over open-ended stays and a range index over dated ones.
+    db.execute("CREATE INDEX idx_tenants_open ON tenants (leave_date, bunk) WHERE leave_date IS NULL")
+    db.execute("CREATE INDEX idx_tenants_leave ON tenants (leave_date, bunk) WHERE leave_date IS NOT NULL")
+
+
+def add_search_index(db):
+    # External-content FTS5 index over the searchable columns, kept in step with tenants by triggers.
+    # Payment/leave edits don't touch it (AFTER UPDATE OF only fires for the indexed columns).
+    db.execute("""
+        CREATE VIRTUAL TABLE tenants_fts USING fts5(
+            name, bunk, room, number,
+            content='tenants', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    """)
+    db.execute("INSERT INTO tenants_fts (tenants_fts) VALUES ('rebuild')")
+    db.execute("""
+        CREATE TRIGGER tenants_fts_insert AFTER INSERT ON tenants BEGIN
+            INSERT INTO tenants_fts (rowid, name, bunk, room, number)
+            VALUES (new.id, new.name, new.bunk, new.room, new.number);
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER tenants_fts_delete AFTER DELETE ON tenants BEGIN
+            INSERT INTO tenants_fts (tenants_fts, rowid, name, bunk, room, number)
+            VALUES ('delete', old.id, old.name, old.bunk, old.room, old.number);
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER tenants_fts_update AFTER UPDATE OF name, bunk, room, number ON tenants BEGIN
+            INSERT INTO tenants_fts (tenants_fts, rowid, name, bunk, room, number)
+            VALUES ('delete', old.id, old.name, old.bunk, old.room, old.number);
+            INSERT INTO tenants_fts (rowid, name, bunk, room, number)
+            VALUES (new.id, new.name, new.bunk, new.room, new.number);
+        END
+    """)
+
+
+def add_payments_ledger(db):
+    # Every payment is its own row; nothing is ever updated or deleted, corrections are negative
+    # amounts. tenant_balances is the running total per tenant, kept up to date by a trigger.
+    db.create_function("parse_amount", 1, parse_amount, deterministic=True)
+    db.execute("""
+        CREATE TABLE payments (
+            id INTEGER PRIMARY KEY,
+            tenant_id INTEGER NOT NULL,
+            amount REAL NOT NULL,
+            paid_at TEXT NOT NULL
+        )
+    """)
+    # Month-end totals read (paid_at, amount) straight from this index
+    db.execute("CREATE INDEX idx_payments_paid_at ON payments (paid_at, amount)")
+    db.execute("CREATE INDEX idx_payments_tenant ON payments (tenant_id, paid_at)")
+    db.execute("""
+        CREATE TABLE tenant_balances (
+            tenant_id INTEGER PRIMARY KEY,
+            total REAL NOT NULL,
+            payment_count INTEGER NOT NULL,
+            last_paid_at TEXT
+        )
+    """)
+    db.execute("""
+        CREATE TRIGGER payments_balance AFTER INSERT ON payments BEGIN
+            INSERT INTO tenant_balances (tenant_id, total, payment_count, last_paid_at)
+            VALUES (new.tenant_id, new.amount, 1, new.paid_at)
+            ON CONFLICT (tenant_id) DO UPDATE SET
+                total = total + excluded.total,
+                payment_count = payment_count + 1,
+                last_paid_at = MAX(last_paid_at, excluded.last_paid_at);
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER payments_no_update BEFORE UPDATE ON payments BEGIN
+            SELECT RAISE(ABORT, 'payments are append-only');
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER payments_no_delete BEFORE DELETE ON payments BEGIN
+            SELECT RAISE(ABORT, 'payments are append-only');
+        END
+    """)
+
+    # The old single payment value becomes one ledger entry, dated at move-in when known
+    db.execute("""
+        INSERT INTO payments (tenant_id, amount, paid_at)
+        SELECT id, parse_amount(payment), IFNULL(date || ' 00:00:00', ?)
+        FROM tenants
+        WHERE parse_amount(payment) <> 0
+        ORDER BY id
+    """, (now_str(),))
+    keep_legacy_values(db, "payment", "payment", "parse_amount(payment) IS NULL AND TRIM(IFNULL(payment, '')) <> ''")
+    db.execute("ALTER TABLE tenants DROP COLUMN payment")
+
+
+# A stay is the half-open day range [date, leave_date) as day numbers; an unknown move-in counts
+# from the beginning of time and an open-ended stay runs forever
+OPEN_START = 0
+OPEN_END = 2147483647
+
+
+def stay_days(row):
+    start = f"IFNULL(CAST(julianday({row}.date) AS INTEGER), {OPEN_START})"
+    end = f"IFNULL(CAST(julianday({row}.leave_date) AS INTEGER), {OPEN_END})"
+    return f"{start}, MAX({start}, {end})"  # a leave date before move-in is an empty stay
+
+
+def add_stay_index(db):
+    # Integer R*Tree over every tenant's stay, kept in step with tenants by triggers, so
+    # "who was here on day D" visits only the stays that cover D
+    db.execute("CREATE VIRTUAL TABLE tenant_stays USING rtree_i32(id, start_day, end_day)")
+    db.execute(f"INSERT INTO tenant_stays (id, start_day, end_day) SELECT id, {stay_days('tenants')} FROM tenants")
+    db.execute(f"""
+        CREATE TRIGGER tenant_stays_insert AFTER INSERT ON tenants BEGIN
+            INSERT INTO tenant_stays (id, start_day, end_day) VALUES (new.id, {stay_days('new')});
+        END
+    """)
+    db.execute(f"""
+        CREATE TRIGGER tenant_stays_update AFTER UPDATE OF date, leave_date ON tenants BEGIN
+            INSERT OR REPLACE INTO tenant_stays (id, start_day, end_day) VALUES (new.id, {stay_days('new')});
+        END
+    """)
+    db.execute("""
+        CREATE TRIGGER tenant_stays_delete AFTER DELETE ON tenants BEGIN
+            DELETE FROM tenant_stays WHERE id = old.id;
+        END
+    """)
+
+
+# Sort orders for paged tenant lists: each is an expression index on (key, id), so a page is an
+# index range scan starting just after the last row of the previous page (keyset pagination).
+# {t} is the table prefix: the queries must spell the key exactly as the index does.
+SORT_KEYS = {
+    "name": "IFNULL({t}name, '') COLLATE NOCASE",
+    "room": "IFNULL({t}room, '')",
+    "bunk": "IFNULL({t}bunk, '')",
+    "date": "IFNULL({t}date, '')",
+}
+SORT_COLUMNS = {"room": 1, "bunk": 2, "name": 3, "date": 4}  # position in a tenant row
+
+
+def page_key(row, sort):
+    # The keyset position of a tenant row: where the next page starts
+    return [row[SORT_COLUMNS[sort]] or "", row[0]]
+
+
+def add_sort_indexes(db):
+    for sort, key in SORT_KEYS.items():
+        # leave_date rides along so the active check skips moved-out tenants without a table lookup
+        db.execute(f"CREATE INDEX idx_tenants_sort_{sort} ON tenants ({key.format(t='')}, id, leave_date)")
+
+
+# 📊 Rollups for the dashboard, kept current by triggers so it never scans tenants or payments.
+# room_occupancy holds per-room day deltas: +1 on a move-in day, -1 on the leave day, so the
+# tenants in a room on day D are the sum of its deltas up to D (one row per room and busy day,
+# however many tenants came and went). An unknown move-in counts from '' (the beginning of time)
+# and a leave date before the move-in cancels the stay out on its move-in day.
+def occupancy_deltas(row, sign):
+    # Statements adding (sign 1) or taking back (sign -1) one tenant row's stay
+    room, start = f"IFNULL({row}.room, '')", f"IFNULL({row}.date, '')"
+    leave = f"MAX({start}, {row}.leave_date)"
+    upsert = "ON CONFLICT (room, day) DO UPDATE SET delta = delta + excluded.delta"
+    # Moves in and out on the same day can cancel out; zero rows are dropped to keep the table small
+    return f"""
+        INSERT INTO room_occupancy (room, day, delta) SELECT {room}, {start}, {sign} WHERE 1 {upsert};
+        INSERT INTO room_occupancy (room, day, delta) SELECT {room}, {leave}, {-sign}
+        WHERE {row}.leave_date IS NOT NULL {upsert};
+        DELETE FROM room_occupancy WHERE room = {room} AND day IN ({start}, {leave}) AND delta = 0;
+    """
+
+
+def room_deltas(where="1"):
+    # The day deltas of every tenant row matching `where`, summed per room and day (set-based,
+    # for filling room_occupancy in one statement)
+    return f"""
+        SELECT room, day, SUM(delta) AS delta FROM (
+            SELECT IFNULL(room, '') AS room, IFNULL(date, '') AS day, 1 AS delta FROM tenants WHERE {where}
+            UNION ALL
+            SELECT IFNULL(room, ''), MAX(IFNULL(date, ''), leave_date), -1 FROM tenants
+            WHERE leave_date IS NOT NULL AND {where}
+        )
+        GROUP BY room, day
+    """
+
+
+def add_rollups(db):
+    db.execute("""
+        CREATE TABLE room_occupancy (
+            room TEXT NOT NULL,
+            day TEXT NOT NULL,
+            delta INTEGER NOT NULL,
+            PRIMARY KEY (room, day)
+        ) WITHOUT ROWID
+    """)
+    db.execute(f"CREATE TRIGGER room_occupancy_insert AFTER INSERT ON tenants BEGIN {occupancy_deltas('new', 1)} END")
+    db.execute(f"""
+        CREATE TRIGGER room_occupancy_update AFTER UPDATE OF room, date, leave_date ON tenants BEGIN
+            {occupancy_deltas('old', -1)}
+            {occupancy_deltas('new', 1)}
+        END
+    """)
+    db.execute(f"CREATE TRIGGER room_occupancy_delete AFTER DELETE ON tenants BEGIN {occupancy_deltas('old', -1)} END")
+
+    # Money collected per room and month. Payments are append-only, so one insert trigger is enough;
+    # a payment stays with the room the tenant was in when it was made.
+    db.execute("""
+        CREATE TABLE room_payments (
+            room TEXT NOT NULL,
+            month TEXT NOT NULL,
+            total REAL NOT NULL,
+            payment_count INTEGER NOT NULL,
+            PRIMARY KEY (room, month)
+        ) WITHOUT ROWID
+    """)
+    db.execute("""
+        CREATE TRIGGER room_payments_insert AFTER INSERT ON payments BEGIN
+            INSERT INTO room_payments (room, month, total, payment_count)
+            VALUES (IFNULL((SELECT room FROM tenants WHERE id = new.tenant_id), ''), substr(new.paid_at, 1, 7), new.amount, 1)
+            ON CONFLICT (room, month) DO UPDATE SET
+                total = total + excluded.total,
+                payment_count = payment_count + 1;
+        END
+    """)
+
+    # Fill both from the history already there
+    db.execute(f"INSERT INTO room_occupancy (room, day, delta) {room_deltas()} HAVING SUM(delta) <> 0")
+    db.execute("""
+        INSERT INTO room_payments (room, month, total, payment_count)
+        SELECT IFNULL(t.room, ''), substr(p.paid_at, 1, 7), SUM(p.amount), COUNT(*)
+        FROM payments p LEFT JOIN tenants t ON t.id = p.tenant_id
+        GROUP BY 1, 2
+    """)
+
+
+MIGRATIONS = [
+    migrate_to_typed_dates,  # 1
+    add_search_index,  # 2
+    add_payments_ledger,  # 3
+    add_stay_index,  # 4
+    add_sort_indexes,  # 5
+    add_rollups,  # 6
+]
+
+
+def migrate(db):
+    # Each step reads the version under the write lock, so when two processes open an old file
+    # at once the second waits, then sees the first one's steps as done instead of repeating them
+    while True:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            version = db.execute("PRAGMA user_version").fetchone()[0]
+            if version >= len(MIGRATIONS):
+                db.execute("COMMIT")
+                return
+            MIGRATIONS[version](db)
+            db.execute(f"PRAGMA user_version = {version + 1}")
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+
+# 🧾 Hot statements. sqlite3 keeps the compiled form of each distinct SQL string in the
+# connection's statement cache, so keeping them as constants means they are prepared once.
+# Tenant rows are (id, room, bunk, name, date, number, balance, leave_date); the balance is one
+# primary-key lookup into tenant_balances, never a sum over payments.
+TENANT_COLUMNS = (
+    "t.id, t.room, t.bunk, t.name, t.date, t.number, IFNULL(b.total, 0), t.leave_date"
+)
+TENANT_BALANCE = "LEFT JOIN tenant_balances b ON b.tenant_id = t.id"
+
+SELECT_ACTIVE_BUNKS = """
+    SELECT id, bunk, leave_date
+    FROM tenants
+    WHERE leave_date IS NULL OR leave_date > ?
+"""
+SELECT_ACTIVE_TENANTS = f"""
+    SELECT {TENANT_COLUMNS}
+    FROM tenants t {TENANT_BALANCE}
+    WHERE t.leave_date IS NULL OR t.leave_date > ?
+"""
+SELECT_ACTIVE_IN_BUNK = f"""
+    SELECT {TENANT_COLUMNS}
+    FROM tenants t {TENANT_BALANCE}
+    WHERE t.bunk = ? AND (t.leave_date IS NULL OR t.leave_date > ?)
+"""
+SELECT_TENANT = f"SELECT {TENANT_COLUMNS} FROM tenants t {TENANT_BALANCE} WHERE t.id = ?"
+SELECT_TENANT_BUNK = "SELECT bunk FROM tenants WHERE id = ?"
+INSERT_TENANT = """
+    INSERT INTO tenants (room, bunk, name, number, date)
+    VALUES (?, ?, ?, ?, ?)
+"""
+SEARCH_ACTIVE_TENANTS = f"""
+    SELECT {TENANT_COLUMNS}
+    FROM tenants_fts
+    JOIN tenants t ON t.id = tenants_fts.rowid
+    {TENANT_BALANCE}
+    WHERE tenants_fts MATCH ? AND (t.leave_date IS NULL OR t.leave_date > ?)
+    ORDER BY tenants_fts.rank
+    LIMIT ?
+"""
+INSERT_TENANT_WITH_ID = """
+    INSERT INTO tenants (id, room, bunk, name, number, date, leave_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_NEXT_TENANT_ID = """
+    SELECT MAX(IFNULL((SELECT seq FROM sqlite_sequence WHERE name = 'tenants'), 0),
+               IFNULL((SELECT MAX(id) FROM tenants), 0)) + 1
+"""
+# Per-row work on every new tenant, replaced by the set-based statements below during a bulk load
+TENANT_INSERT_TRIGGERS = ("tenants_fts_insert", "tenant_stays_insert", "room_occupancy_insert")
+SELECT_TENANT_INSERT_TRIGGERS = f"""
+    SELECT name, sql FROM sqlite_master
+    WHERE type = 'trigger' AND name IN ({', '.join('?' * len(TENANT_INSERT_TRIGGERS))})
+"""
+BULK_INDEX_TENANTS = (
+    "INSERT INTO tenants_fts (rowid, name, bunk, room, number) SELECT id, name, bunk, room, number FROM tenants WHERE id >= :first",
+    f"INSERT INTO tenant_stays (id, start_day, end_day) SELECT id, {stay_days('tenants')} FROM tenants WHERE id >= :first",
+    f"""
+        INSERT INTO room_occupancy (room, day, delta) SELECT * FROM ({room_deltas('id >= :first')}) WHERE 1
+        ON CONFLICT (room, day) DO UPDATE SET delta = delta + excluded.delta
+    """,
+    "DELETE FROM room_occupancy WHERE delta = 0",
+)
+SELECT_ALL_TENANTS = f"SELECT {TENANT_COLUMNS} FROM tenants t {TENANT_BALANCE} ORDER BY t.id"
+# Keyset pages after (:key, :id), the last row already shown. Two index seeks, run in this order:
+# the rest of that row's key, then the keys after it. (A single "key >= :key" range would rescan
+# every earlier row sharing the key, e.g. a whole room, on every page.)
+ACTIVE_PAGE = {
+    sort: f"""
+    SELECT * FROM (
+        SELECT {TENANT_COLUMNS}
+        FROM tenants t {TENANT_BALANCE}
+        WHERE {key.format(t="t.")} = :key AND t.id > :id
+          AND (t.leave_date IS NULL OR t.leave_date > :today)
+        ORDER BY t.id
+        LIMIT :limit
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT {TENANT_COLUMNS}
+        FROM tenants t {TENANT_BALANCE}
+        WHERE {key.format(t="t.")} > :key
+          AND (t.leave_date IS NULL OR t.leave_date > :today)
+        ORDER BY {key.format(t="t.")}, t.id
+        LIMIT :limit
+    )
+    LIMIT :limit
+"""
+    for sort, key in SORT_KEYS.items()
+}
+# Matches are few, so search pages just filter and sort them
+SEARCH_PAGE = {
+    sort: f"""
+    SELECT {TENANT_COLUMNS}
+    FROM tenants_fts
+    JOIN tenants t ON t.id = tenants_fts.rowid
+    {TENANT_BALANCE}
+    WHERE tenants_fts MATCH :terms AND (t.leave_date IS NULL OR t.leave_date > :today)
+      AND {key.format(t="t.")} >= :key AND ({key.format(t="t.")} > :key OR t.id > :id)
+    ORDER BY {key.format(t="t.")}, t.id
+    LIMIT :limit
+"""
+    for sort, key in SORT_KEYS.items()
+}
+# Dashboard rollups: everything before :start folds into one '' row per room
+SELECT_ROOM_OCCUPANCY_SINCE = """
+    SELECT room, '' AS day, SUM(delta) FROM room_occupancy WHERE day < :start GROUP BY room
+    UNION ALL
+    SELECT room, day, delta FROM room_occupancy WHERE day >= :start
+    ORDER BY room, day
+"""
+SELECT_ROOM_PAYMENTS_SINCE = """
+    SELECT room, month, total, payment_count FROM room_payments WHERE month >= ? ORDER BY room, month
+"""
+# Leave dates in a range, straight off the dated-stays index
+SELECT_LEAVING = f"""
+    SELECT {TENANT_COLUMNS}
+    FROM tenants t {TENANT_BALANCE}
+    WHERE t.leave_date >= ? AND t.leave_date <= ?
+    ORDER BY t.leave_date, t.bunk
+"""
+INSERT_PAYMENT = "INSERT INTO payments (tenant_id, amount, paid_at) VALUES (?, ?, ?)"
+SELECT_BALANCE = "SELECT IFNULL((SELECT total FROM tenant_balances WHERE tenant_id = ?), 0)"
+SELECT_TENANT_PAYMENTS = """
+    SELECT id, amount, paid_at
+    FROM payments
+    WHERE tenant_id = ?
+    ORDER BY paid_at, id
+"""
+# Reconciliation: a range scan of idx_payments_paid_at, end exclusive ('2024-06-01' to '2024-07-01')
+SELECT_PAYMENT_TOTALS = """
+    SELECT COUNT(*), IFNULL(SUM(amount), 0)
+    FROM payments
+    WHERE paid_at >= ? AND paid_at < ?
+"""
+SELECT_PAYMENTS_BETWEEN = """
+    SELECT p.id, p.tenant_id, t.name, t.bunk, p.amount, p.paid_at
+    FROM payments p
+    LEFT JOIN tenants t ON t.id = p.tenant_id
+    WHERE p.paid_at >= ? AND p.paid_at < ?
+    ORDER BY p.paid_at, p.id
+"""
+# Point in time: the R*Tree finds the stays covering the day, the date columns confirm them
+# CROSS JOIN keeps SQLite from driving the query off the leave_date indexes instead (for a past
+# date those visit every stay that ended later); tenants is only probed by id
+SELECT_ACTIVE_BUNKS_AT = """
+    SELECT t.id, t.bunk
+    FROM tenant_stays s
+    CROSS JOIN tenants t ON t.id = s.id
+    WHERE s.start_day <= CAST(julianday(:date) AS INTEGER) AND s.end_day > CAST(julianday(:date) AS INTEGER)
+      AND (t.date IS NULL OR t.date <= :date) AND (t.leave_date IS NULL OR t.leave_date > :date)
+"""
+SELECT_STAYS_BETWEEN = """
+    SELECT t.id, t.bunk, t.date, t.leave_date
+    FROM tenant_stays s
+    JOIN tenants t ON t.id = s.id
+    WHERE s.start_day < CAST(julianday(:end) AS INTEGER) AND s.end_day > CAST(julianday(:start) AS INTEGER)
+      AND s.start_day < s.end_day
+"""
+UPDATE_LEAVE_DATE = "UPDATE tenants SET leave_date = ? WHERE id = ?"
+DELETE_TENANT = "DELETE FROM tenants WHERE id = ?"
+
+
+# 🗄️ Owns the tenants.db connection. Writes open a transaction lazily and leave it open,
+# so a burst of edits is committed together by flush() (the app calls it once the burst is over).
+class TenantRepository:
+    def __init__(self, path="tenants.db", factory=sqlite3.Connection, check_same_thread=True):
+        # factory: a sqlite3.Connection subclass, e.g. profiling.TimedConnection to time every statement
+        self.conn = sqlite3.connect(
+            path, isolation_level=None, cached_statements=128, factory=factory, check_same_thread=check_same_thread
+        )
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # In WAL mode NORMAL only syncs at checkpoints; a power cut can lose the last commit but never corrupts
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        self.conn.execute("PRAGMA cache_size = -8000")  # 8 MB
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS tenants (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            room TEXT,
+            bunk TEXT,
+            name TEXT,
+            date TEXT,
+            number TEXT,
+            payment TEXT DEFAULT '',
+            leave_date TEXT DEFAULT ''
+        )
+        """)
+        migrate(self.conn)
+        self.depth = 0
+
+    # 🔒 Transactions
+    @contextmanager
+    def transaction(self):
+        # Groups several writes so they commit (or roll back) together. Inside an open transaction
+        # (an outer one, or a burst the worker has not committed yet) it is a savepoint, so a failure
+        # only undoes its own writes, never earlier ones the UI was already told about.
+        savepoint = f"nested_{self.depth}" if self.conn.in_transaction else None
+        self.conn.execute(f"SAVEPOINT {savepoint}" if savepoint else "BEGIN IMMEDIATE")
+        self.depth += 1
+        try:
+            yield self
+        except Exception:
+            self.depth -= 1
+            if savepoint is None:
+                self.conn.execute("ROLLBACK")
+            elif self.conn.in_transaction:  # some errors make SQLite roll back everything itself
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                self.conn.execute(f"RELEASE {savepoint}")
+            raise
+        self.depth -= 1
+        self.conn.execute(f"RELEASE {savepoint}" if savepoint else "COMMIT")
+
+    def write(self, sql, params=()):
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn.execute(sql, params)
+
+    def has_pending_writes(self):
+        return self.conn.in_transaction
+
+    def flush(self):
+        if self.conn.in_transaction and self.depth == 0:
+            try:
+                self.conn.execute("COMMIT")
+            except sqlite3.Error:
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")  # the burst is gone either way; don't retry it forever
+                raise
+
+    def close(self):
+        if self.conn is None:
+            return
+        self.flush()
+        self.conn.close()
+        self.conn = None
+
+    # 🟥 Occupancy
+    def occupancy_snapshot(self, bunk_names):
+        # Active/vacant status for a whole room in one grouped query
+        bunk_names = list(dict.fromkeys(bunk_names))
+        snapshot = {bunk: False for bunk in bunk_names}
+        if not bunk_names:
+            return snapshot
+
+        placeholders = ", ".join("?" for _ in bunk_names)
+        rows = self.conn.execute(f"""
+            SELECT bunk, MAX(leave_date IS NULL OR leave_date > ?)
+            FROM tenants
+            WHERE bunk IN ({placeholders})
+            GROUP BY bunk
+        """, (today_str(), *bunk_names))
+        for bunk, occupied in rows:
+            snapshot[bunk] = bool(occupied)
+        return snapshot
+
+    def active_bunks(self):
+        return self.conn.execute(SELECT_ACTIVE_BUNKS, (today_str(),)).fetchall()
+
+    def active_bunks_at(self, date):
+        # (tenant id, bunk) for everyone staying on that date: moved in on or before it, leaving after it
+        return self.conn.execute(SELECT_ACTIVE_BUNKS_AT, {"date": parse_date(date)}).fetchall()
+
+    def stays_between(self, start, end):
+        # (tenant id, bunk, date, leave_date) for every stay overlapping start <= day < end
+        params = {"start": parse_date(start), "end": parse_date(end)}
+        return self.conn.execute(SELECT_STAYS_BETWEEN, params).fetchall()
+
+    # 👥 Tenants
+    def active_tenants(self):
+        return self.conn.execute(SELECT_ACTIVE_TENANTS, (today_str(),)).fetchall()
+
+    def active_tenants_in_bunk(self, bunk_name):
+        return self.conn.execute(SELECT_ACTIVE_IN_BUNK, (bunk_name, today_str())).fetchall()
+
+    def search_active_tenants(self, text, limit=50):
+        terms = search_terms(text)
+        if not terms:
+            return []
+        return self.conn.execute(SEARCH_ACTIVE_TENANTS, (terms, today_str(), limit)).fetchall()
+
+    def tenants_leaving(self, start, end):
+        # Tenants whose leave date falls between start and end, both included
+        return self.conn.execute(SELECT_LEAVING, (parse_date(start), parse_date(end))).fetchall()
+
+    def active_tenants_page(self, sort="name", after=None, limit=50, search=None):
+        # One page of active tenants (optionally only those matching search) in sort order.
+        # Returns (rows, after): pass after back for the next page; it is None after the last one.
+        if sort not in SORT_KEYS:
+            raise ValueError(f"unknown sort {sort!r}, expected one of {', '.join(SORT_KEYS)}")
+        key, last_id = after or ("", 0)
+        params = {"today": today_str(), "key": key, "id": last_id, "limit": limit}
+        if search:
+            params["terms"] = search_terms(search)
+            if not params["terms"]:
+                return [], None
+            rows = self.conn.execute(SEARCH_PAGE[sort], params).fetchall()
+        else:
+            rows = self.conn.execute(ACTIVE_PAGE[sort], params).fetchall()
+        if len(rows) < limit:
+            return rows, None
+        return rows, page_key(rows[-1], sort)
+
+    def get_tenant(self, tenant_id):
+        return self.conn.execute(SELECT_TENANT, (tenant_id,)).fetchone()
+
+    def tenant_bunk(self, tenant_id):
+        row = self.conn.execute(SELECT_TENANT_BUNK, (tenant_id,)).fetchone()
+        return row[0] if row else None
+
+    def add_tenant(self, room, bunk, name, number, date, payment):
+        date = parse_date(date)
+        payment = float(payment) if payment else 0.0
+        with self.transaction():
+            tenant_id = self.write(INSERT_TENANT, (room, bunk, name, number, date)).lastrowid
+            if payment:
+                self.record_payment(tenant_id, payment)
+        return tenant_id
+
+    def update_leave_date(self, tenant_id, leave_date):
+        leave_date = parse_date(leave_date)
+        self.write(UPDATE_LEAVE_DATE, (leave_date, tenant_id))
+        return leave_date
+
+    def delete_tenant(self, tenant_id):
+        # The tenant's payments and balance stay in the ledger for the books
+        self.write(DELETE_TENANT, (tenant_id,))
+
+    # 📦 Bulk
+    def next_tenant_id(self):
+        return self.conn.execute(SELECT_NEXT_TENANT_ID).fetchone()[0]
+
+    @contextmanager
+    def bulk_load(self):
+        # A transaction for inserting many tenants (see transfer.py). The per-row insert triggers
+        # on tenants are dropped inside it, so no other connection ever sees them missing, and the
+        # search index, stay index and occupancy rollup are filled for all the new rows at the end
+        # in one statement each. Those per-row triggers made import time grow with the square of its size.
+        with self.transaction():
+            first = self.next_tenant_id()
+            triggers = self.conn.execute(SELECT_TENANT_INSERT_TRIGGERS, TENANT_INSERT_TRIGGERS).fetchall()
+            for name, _ in triggers:
+                self.conn.execute(f"DROP TRIGGER {name}")
+            yield self
+            for statement in BULK_INDEX_TENANTS:
+                self.conn.execute(statement, {"first": first})
+            for _, sql in triggers:
+                self.conn.execute(sql)
+
+    def insert_tenants(self, tenants, payments):
+        # One batch of already validated rows with their ids assigned, inside bulk_load():
+        # tenants are (id, room, bunk, name, number, date, leave_date), payments (tenant_id, amount, paid_at).
+        # No savepoint per batch: each one makes every later batch slower.
+        if not self.depth:
+            raise RuntimeError("insert_tenants must run inside bulk_load()")
+        self.conn.executemany(INSERT_TENANT_WITH_ID, tenants)
+        self.conn.executemany(INSERT_PAYMENT, payments)
+
+    def iter_tenants(self):
+        # A cursor, so callers stream the rows instead of holding the whole table
+        return self.conn.execute(SELECT_ALL_TENANTS)
+
+    # 💰 Payments
+    def record_payment(self, tenant_id, amount, paid_at=None):
+        # Appends to the ledger (negative amounts are refunds/corrections); returns the new balance
+        self.write(INSERT_PAYMENT, (tenant_id, float(amount), paid_at or now_str()))
+        return self.balance(tenant_id)
+
+    def balance(self, tenant_id):
+        return self.conn.execute(SELECT_BALANCE, (tenant_id,)).fetchone()[0]
+
+    def tenant_payments(self, tenant_id):
+        return self.conn.execute(SELECT_TENANT_PAYMENTS, (tenant_id,)).fetchall()
+
+    def payment_totals(self, start, end):
+        # (number of payments, total amount) with start <= paid_at < end
+        return self.conn.execute(SELECT_PAYMENT_TOTALS, (start, end)).fetchone()
+
+    def payments_between(self, start, end):
+        return self.conn.execute(SELECT_PAYMENTS_BETWEEN, (start, end)).fetchall()
+
+    def room_occupancy_since(self, start):
+        # (room, day, change in tenants) from the occupancy rollup, by room and day; the first row
+        # of each room (day '') is the number of tenants it had before start
+        return self.conn.execute(SELECT_ROOM_OCCUPANCY_SINCE, {"start": parse_date(start)}).fetchall()
+
+    def room_payments_since(self, month):
+        # (room, month, total, number of payments) from the payments rollup, month as YYYY-MM
+        return self.conn.execute(SELECT_ROOM_PAYMENTS_SINCE, (month,)).fetchall()
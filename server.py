@@ -0,0 +1,243 @@
+import argparse
+import hmac
+import inspect
+import ipaddress
+import json
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import settings
+from backup import BackupSchedule
+from repository import TenantRepository
+
+
+# 🌐 Tenant service: one process owns tenants.db and every front desk talks to it over HTTP/JSON,
+# so SQLite only ever sees one writer. Clients call repository methods by name and follow a
+# long-poll change feed to hear about each other's edits.
+#   python server.py --db tenants.db --port 8765 [--backup-hours 24]
+#   POST /api/<method>  {"args": [...], "kwargs": {...}}  ->  {"result": ...} or {"error": "..."}
+#   GET  /api/changes?since=<seq>&timeout=<seconds>     ->  {"epoch", "seq", "reset", "changes"}
+# With a token (BEDSPACE_SERVER_TOKEN, required off loopback) every /api request must carry it
+# in X-Bedspace-Token; /health stays open.
+READ_METHODS = {
+    "active_bunks", "active_tenants", "active_tenants_in_bunk", "search_active_tenants",
+    "get_tenant", "tenant_bunk", "occupancy_snapshot", "active_bunks_at", "stays_between",
+    "balance", "tenant_payments", "payment_totals", "payments_between", "tenants_leaving",
+    "active_tenants_page", "room_occupancy_since", "room_payments_since",
+}
+WRITE_METHODS = {"add_tenant", "record_payment", "update_leave_date", "delete_tenant"}
+DEFAULT_PORT = 8765
+TOKEN_HEADER = "X-Bedspace-Token"
+POLL_TIMEOUT = 25  # seconds a change request is held open when nothing happens
+
+
+class ConnectionPool:
+    # Readers share a few WAL connections; writes go through one connection under a lock
+    def __init__(self, path, size=4):
+        self.readers = queue.Queue()
+        # Handler threads take turns with each connection, never share one at the same time
+        for _ in range(size):
+            self.readers.put(TenantRepository(path, check_same_thread=False))
+        self.writer = TenantRepository(path, check_same_thread=False)
+        self.write_lock = threading.Lock()
+
+    @contextmanager
+    def reader(self):
+        repo = self.readers.get()
+        try:
+            yield repo
+        finally:
+            self.readers.put(repo)
+
+    @contextmanager
+    def writing(self):
+        with self.write_lock, self.writer.transaction():
+            yield self.writer
+
+    def close(self):
+        while not self.readers.empty():
+            self.readers.get().close()
+        self.writer.close()
+
+
+class ChangeFeed:
+    # Recent changes, numbered; long-poll readers wait on the condition for anything newer
+    def __init__(self, keep=1000):
+        self.epoch = f"{time.time():.6f}"  # a restart starts a new numbering
+        self.seq = 0
+        self.changes = deque(maxlen=keep)
+        self.condition = threading.Condition()
+
+    def publish(self, change):
+        with self.condition:
+            self.seq += 1
+            self.changes.append(dict(change, seq=self.seq))
+            self.condition.notify_all()
+
+    def since(self, seq, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.seq > seq or seq > self.seq, timeout)
+            # Asked for changes we no longer keep (or from before a restart): the client must reload
+            reset = seq > self.seq or bool(self.changes and self.changes[0]["seq"] > seq + 1)
+            changes = [] if reset else [c for c in self.changes if c["seq"] > seq]
+            return {"epoch": self.epoch, "seq": self.seq, "reset": reset, "changes": changes}
+
+
+def describe_change(repo, method, arguments, result):
+    # What a client needs to update its occupancy model without asking again;
+    # arguments are the call's bound arguments by name, however the client passed them
+    if method == "add_tenant":
+        return {"kind": "added", "tenant_id": result, "bunk": arguments["bunk"]}
+    if method == "update_leave_date":
+        tenant_id = arguments["tenant_id"]
+        return {"kind": "leave_date", "tenant_id": tenant_id, "leave_date": result, "bunk": repo.tenant_bunk(tenant_id)}
+    if method == "record_payment":
+        return {"kind": "payment", "tenant_id": arguments["tenant_id"]}
+    return {"kind": "removed", "tenant_id": arguments["tenant_id"]}
+
+
+class TenantService:
+    def __init__(self, path="tenants.db", pool_size=4):
+        self.pool = ConnectionPool(path, pool_size)
+        self.feed = ChangeFeed()
+
+    def call(self, method, args, kwargs, client=None):
+        if method in READ_METHODS:
+            with self.pool.reader() as repo:
+                return getattr(repo, method)(*args, **kwargs)
+        if method in WRITE_METHODS:
+            with self.pool.writing() as repo:
+                write = getattr(repo, method)
+                arguments = inspect.signature(write).bind(*args, **kwargs)  # TypeError (a 400) for a bad call
+                result = write(*arguments.args, **arguments.kwargs)
+            # Only after the commit, so a problem describing the change can never undo the write
+            try:
+                with self.pool.reader() as repo:
+                    change = describe_change(repo, method, arguments.arguments, result)
+            except Exception as e:
+                print(f"Error describing {method} for the change feed: {e}")
+                return result
+            self.feed.publish(dict(change, client=client))
+            return result
+        raise LookupError(f"unknown method {method!r}")
+
+    def close(self):
+        self.pool.close()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+    token = ""  # set by make_server; empty accepts every request
+
+    def authorized(self):
+        if not self.token:
+            return True
+        return hmac.compare_digest(self.headers.get(TOKEN_HEADER, "").encode(), self.token.encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self.reply(200, {"ok": True})
+        if not self.authorized():
+            return self.reply(401, {"error": "missing or wrong token"})
+        if url.path == "/api/changes":
+            query = parse_qs(url.query)
+            try:
+                since = int(query.get("since", ["0"])[0])
+                timeout = min(float(query.get("timeout", [POLL_TIMEOUT])[0]), POLL_TIMEOUT)
+            except ValueError:
+                return self.reply(400, {"error": "since and timeout must be numbers"})
+            return self.reply(200, self.service.feed.since(since, timeout))
+        self.reply(404, {"error": f"no such path {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not url.path.startswith("/api/"):
+            return self.reply(404, {"error": f"no such path {url.path}"})
+        if not self.authorized():
+            return self.reply(401, {"error": "missing or wrong token"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            args, kwargs = body.get("args", []), body.get("kwargs", {})
+        except (ValueError, AttributeError):
+            return self.reply(400, {"error": "body must be a JSON object"})
+        try:
+            result = self.service.call(url.path[len("/api/"):], args, kwargs, self.headers.get("X-Client-Id"))
+        except LookupError as e:
+            return self.reply(404, {"error": str(e)})
+        except (ValueError, TypeError) as e:
+            return self.reply(400, {"error": str(e)})
+        except Exception as e:
+            print(f"Error in {url.path}: {e}")
+            return self.reply(500, {"error": str(e)})
+        self.reply(200, {"result": result})
+
+    def reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per request would drown out the errors
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False  # a hostname: assume it is reachable from elsewhere
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, token=""):
+    if not token and not is_loopback(host):
+        raise ValueError(f"serving on {host} needs a token, or any device on the network can change tenants")
+    handler = type("Handler", (ServiceHandler,), {"service": service, "token": token})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve tenants.db to the front-desk apps over HTTP/JSON")
+    parser.add_argument("--db", default="tenants.db")
+    parser.add_argument("--host", default="127.0.0.1", help="0.0.0.0 to accept other desks on the LAN")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--pool", type=int, default=4, help="read connections")
+    parser.add_argument("--backup-hours", type=float, default=0, help="snapshot the database this often (default: off)")
+    parser.add_argument("--backup-dir", default=settings.BACKUP_DIR)
+    args = parser.parse_args(argv)
+    if not settings.SERVER_TOKEN and not is_loopback(args.host):
+        parser.error(f"--host {args.host} accepts other machines: set BEDSPACE_SERVER_TOKEN on the server and every desk")
+
+    service = TenantService(args.db, args.pool)
+    server = make_server(service, args.host, args.port, settings.SERVER_TOKEN)
+    backups = None
+    if args.backup_hours > 0:
+        backups = BackupSchedule(
+            args.db, args.backup_dir, args.backup_hours, settings.BACKUP_KEEP, settings.BACKUP_DAYS
+        ).start()
+    print(f"Serving {args.db} on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if backups is not None:
+            backups.stop()
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
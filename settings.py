@@ -0,0 +1,47 @@
+import os
+
+
+# ⚙️ Settings, read from environment variables so kiosks can be tuned without code changes
+def env_flag(name, default=False):
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_float(name, default=0.0):
+    value = os.environ.get(name)
+    try:
+        return float(value) if value else default
+    except ValueError:
+        print(f"Ignoring {name}={value!r}: not a number")
+        return default
+
+
+# Show a still poster instead of the looping menu video
+LOW_POWER = env_flag('BEDSPACE_LOW_POWER')
+
+# When set to N, measure idle CPU use on the menu for N seconds with and without the video
+MEASURE_IDLE_CPU = env_float('BEDSPACE_MEASURE_IDLE_CPU')
+
+# Time every SQL statement, screen/popup build and frame, with an on-screen overlay (F12 hides it)
+PROFILE = env_flag('BEDSPACE_PROFILE')
+# Statements slower than this are printed and kept in the slow-query log
+SLOW_QUERY_MS = env_float('BEDSPACE_SLOW_QUERY_MS', 50.0)
+# Where the overlay's Save button and app exit write the profile
+PROFILE_FILE = os.environ.get('BEDSPACE_PROFILE_FILE') or os.path.join('cache', 'profile.json')
+
+# URL of a shared tenant service (python server.py), e.g. http://192.168.1.10:8765;
+# empty to open tenants.db directly
+SERVER_URL = os.environ.get('BEDSPACE_SERVER', '').strip()
+# Shared secret between server.py and the desks, sent with every request; server.py refuses to
+# listen beyond this machine (e.g. --host 0.0.0.0) without one
+SERVER_TOKEN = os.environ.get('BEDSPACE_SERVER_TOKEN', '').strip()
+
+# Online snapshots of tenants.db every N hours while the app runs (0 turns them off; with
+# BEDSPACE_SERVER set, run server.py --backup-hours instead), kept in BEDSPACE_BACKUP_DIR
+BACKUP_HOURS = env_float('BEDSPACE_BACKUP_HOURS', 24.0)
+BACKUP_DIR = os.environ.get('BEDSPACE_BACKUP_DIR') or 'backups'
+# Retention: the newest BACKUP_KEEP snapshots, plus the last one of each day for BACKUP_DAYS days
+BACKUP_KEEP = int(env_float('BEDSPACE_BACKUP_KEEP', 7))
+BACKUP_DAYS = int(env_float('BEDSPACE_BACKUP_DAYS', 30))
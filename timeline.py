@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from itertools import groupby
+
+from repository import parse_date
+
+
+# 📈 Occupancy over time. Each tenant row is a stay [date, leave_date); a day-by-day series is one
+# sweep over the range: every stay adds +1 on the day it starts and -1 on the day it ends, then the
+# days are walked once in order. O(stays + days), however long the range or the history.
+def day_index(text, first):
+    return date.fromisoformat(text).toordinal() - first
+
+
+def occupancy_series(stays, start, end):
+    # stays: (tenant id, bunk, date, leave_date) rows, e.g. from TenantRepository.stays_between.
+    # Returns [(day, occupied bunks, tenants)] for every day with start <= day < end.
+    first = date.fromisoformat(parse_date(start)).toordinal()
+    days = date.fromisoformat(parse_date(end)).toordinal() - first
+    if days <= 0:
+        return []
+
+    changes = [[] for _ in range(days + 1)]  # bucketed by day, so no sort is needed
+    for tenant_id, bunk, move_in, leave in stays:
+        begin = max(day_index(move_in, first), 0) if move_in else 0
+        finish = min(day_index(leave, first), days) if leave else days
+        if begin < finish:
+            changes[begin].append((bunk, 1))
+            changes[finish].append((bunk, -1))
+
+    series = []
+    staying_in = {}  # bunk -> tenants staying today
+    tenants = 0
+    for offset in range(days):
+        for bunk, step in changes[offset]:
+            staying_in[bunk] = staying_in.get(bunk, 0) + step
+            if not staying_in[bunk]:
+                del staying_in[bunk]
+            tenants += step
+        day = date.fromordinal(first + offset).isoformat()
+        series.append((day, len(staying_in), tenants))
+    return series
+
+
+def daily_occupancy(repo, start, end):
+    return occupancy_series(repo.stays_between(start, end), start, end)
+
+
+# 📊 Per-room months for the dashboard, from the trigger-maintained rollups only
+def month_windows(months, today):
+    # [(YYYY-MM, first day ordinal, end ordinal)] for the last `months` months, oldest first;
+    # the current month ends after today
+    windows = []
+    first = today.replace(day=1)
+    end = today.toordinal() + 1
+    for _ in range(months):
+        windows.append((f"{first:%Y-%m}", first.toordinal(), end))
+        end = first.toordinal()
+        first = (first - timedelta(days=1)).replace(day=1)
+    return windows[::-1]
+
+
+def monthly_occupancy(deltas, windows):
+    # deltas: (room, day, change) rows by room and day, as from TenantRepository.room_occupancy_since.
+    # Returns ({room: tenants on the last day}, [(room, month, average tenants over the month)])
+    current, averages = {}, []
+    for room, rows in groupby(deltas, key=lambda row: row[0]):
+        changes = [(date.fromisoformat(day).toordinal() if day else 0, change) for _, day, change in rows]
+        index = tenants = 0
+        for month, first, end in windows:
+            tenant_days = 0
+            for day in range(first, end):
+                while index < len(changes) and changes[index][0] <= day:
+                    tenants += changes[index][1]
+                    index += 1
+                tenant_days += tenants
+            averages.append((room, month, tenant_days / (end - first)))
+        current[room] = tenants
+    return current, averages
+
+
+def room_dashboard(repo, months=12, today=None):
+    # Everything the dashboard shows, in two reads of the rollup tables
+    windows = month_windows(months, today or date.today())
+    start = date.fromordinal(windows[0][1]).isoformat()
+    current, occupancy = monthly_occupancy(repo.room_occupancy_since(start), windows)
+    return {
+        "months": [month for month, _, _ in windows],
+        "current": current,
+        "occupancy": occupancy,
+        "payments": [tuple(row) for row in repo.room_payments_since(windows[0][0])],
+    }
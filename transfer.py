@@ -0,0 +1,187 @@
+import csv
+import json
+import os
+
+from repository import now_str, parse_amount, parse_date
+
+
+# 📦 Bulk import/export of tenants as CSV, JSON (an array of objects) or JSON Lines.
+# Files are read and written a row at a time, so the table never has to fit in memory.
+EXPORT_FIELDS = ("id", "room", "bunk", "name", "date", "number", "balance", "leave_date")
+IMPORT_BATCH = 1000
+
+# Header spellings seen in the old spreadsheets -> column names
+FIELD_ALIASES = {
+    "move_in": "date", "start_date": "date", "date_in": "date",
+    "contact": "number", "contact_number": "number", "phone": "number",
+    "move_out": "leave_date", "leave": "leave_date", "date_out": "leave_date",
+    "paid": "payment", "balance": "payment", "initial_payment": "payment",
+}
+
+
+def file_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".json":
+        return "json"
+    raise ValueError(f"unsupported file type {ext!r}, expected .csv, .json or .jsonl")
+
+
+# 📥 Reading: every reader yields (line or item number, dict) pairs; a part that is not valid
+# JSON comes through as (number, ValueError) so it is rejected like any other bad row
+def read_csv(f):
+    reader = csv.DictReader(f)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_jsonl(f):
+    for number, line in enumerate(f, start=1):
+        if line.strip():
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield number, ValueError(f"not valid JSON: {e.msg} at column {e.colno}")
+
+
+def read_json_array(f, chunk_size=65536):
+    # Decodes one object at a time out of "[{...}, {...}]" without loading the whole array
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    number = 0
+    while True:
+        chunk = f.read(chunk_size)
+        buffer += chunk
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if not buffer:
+                    break
+                if buffer[0] != "[":
+                    raise ValueError("expected a JSON array of tenants")
+                buffer = buffer[1:]
+                started = True
+                continue
+            if buffer.startswith(","):
+                buffer = buffer[1:]
+                continue
+            if buffer.startswith("]") or not buffer:
+                break
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                if not chunk:
+                    # No way to tell where a broken item ends, so the rest of the array is skipped
+                    yield number + 1, ValueError(f"not valid JSON: {e.msg}; the rest of the file was skipped")
+                    return
+                break  # the object continues in the next chunk
+            number += 1
+            yield number, item
+            buffer = buffer[end:]
+        if not chunk or buffer.startswith("]"):
+            return
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl, "json": read_json_array}
+
+
+def read_rows(path):
+    fmt = file_format(path)
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8-sig") as f:
+        yield from READERS[fmt](f)
+
+
+def normalize(raw):
+    # One input row -> (room, bunk, name, number, date, leave_date, payment); ValueError says why not
+    if isinstance(raw, ValueError):
+        raise raw
+    if not isinstance(raw, dict):
+        raise ValueError("row is not an object")
+    row = {}
+    for key, value in raw.items():
+        if key is None:
+            raise ValueError("more values than columns")
+        key = key.strip().lower().replace(" ", "_")
+        row[FIELD_ALIASES.get(key, key)] = "" if value is None else str(value).strip()
+
+    name, bunk = row.get("name", ""), row.get("bunk", "")
+    if not name:
+        raise ValueError("missing name")
+    if not bunk:
+        raise ValueError("missing bunk")
+    payment = parse_amount(row.get("payment") or 0)
+    if payment is None:
+        raise ValueError(f"unreadable payment {row['payment']!r}")
+    return (
+        row.get("room", ""), bunk, name, row.get("number", ""),
+        parse_date(row.get("date")), parse_date(row.get("leave_date")), payment,
+    )
+
+
+def import_tenants(repo, path, batch_size=IMPORT_BATCH):
+    # Validates every row, inserts the good ones in executemany batches inside one bulk-load
+    # transaction (all or nothing if the database itself fails) and returns
+    # (number imported, [(line, reason), ...] for the rejected rows).
+    rejected = []
+    imported = 0
+    paid_at = now_str()
+    with repo.bulk_load():
+        next_id = repo.next_tenant_id()
+        tenants, payments = [], []
+        for line, raw in read_rows(path):
+            try:
+                room, bunk, name, number, date, leave_date, payment = normalize(raw)
+            except ValueError as e:
+                rejected.append((line, str(e)))
+                continue
+            tenants.append((next_id, room, bunk, name, number, date, leave_date))
+            if payment:
+                # An opening balance is booked on the move-in day, like the old payment column was
+                payments.append((next_id, payment, f"{date} 00:00:00" if date else paid_at))
+            next_id += 1
+            if len(tenants) >= batch_size:
+                repo.insert_tenants(tenants, payments)
+                imported += len(tenants)
+                tenants, payments = [], []
+        if tenants:
+            repo.insert_tenants(tenants, payments)
+            imported += len(tenants)
+    return imported, rejected
+
+
+def write_error_report(rejected, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(("line", "error"))
+        writer.writerows(rejected)
+
+
+# 📤 Writing
+def export_tenants(repo, path):
+    # Streams every tenant, including those who have left, straight from the cursor; returns the count
+    fmt = file_format(path)
+    count = 0
+    temp = path + ".tmp"
+    with open(temp, "w", newline="" if fmt == "csv" else None, encoding="utf-8") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+        elif fmt == "json":
+            f.write("[")
+        for row in repo.iter_tenants():
+            if fmt == "csv":
+                writer.writerow(["" if value is None else value for value in row])
+            else:
+                record = json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False)
+                if fmt == "json":
+                    f.write(",\n" if count else "\n")
+                f.write(record + ("\n" if fmt == "jsonl" else ""))
+            count += 1
+        if fmt == "json":
+            f.write("\n]\n")
+    os.replace(temp, path)
+    return count